@@ -0,0 +1,592 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+try:
+    import resource  # Peak RSS (not available on Windows)
+except ImportError:
+    resource = None
+
+
+# Synthetic test resolutions: VGA through 24 MP
+RESOLUTIONS = {
+    "vga": (640, 480),
+    "hd": (1280, 720),
+    "fhd": (1920, 1080),
+    "12mp": (4000, 3000),
+    "24mp": (6000, 4000),
+}
+
+
+def make_synthetic_image(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """
+    Deterministic RGB test image: smooth gradients (for enhancement/histograms),
+    hard-edged shapes (for edges, morphology, circles) and mild noise (for denoising).
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[..., 0] = x
+    image[..., 1] = y
+    image[..., 2] = (x + y) / 2
+
+    scale = min(width, height)
+    for _ in range(12):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.circle(image, center, int(rng.integers(scale // 20, scale // 6)), color, -1)
+        corner = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        cv2.rectangle(image, corner, (corner[0] + scale // 8, corner[1] + scale // 10), color, -1)
+
+    noise = rng.integers(-12, 13, size=image.shape, dtype=np.int16)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def prepare_inputs(workdir: str, label: str, width: int, height: int) -> dict:
+    """Write the synthetic inputs one resolution needs (single image, frame folder, batch folder)."""
+    folder = os.path.join(workdir, label)
+    os.makedirs(folder, exist_ok=True)
+    image = make_synthetic_image(width, height)
+
+    image_path = os.path.join(folder, "synthetic.jpg")
+    Image.fromarray(image).save(image_path, quality=90)
+
+    # Small frame sequence for GIFMaker (RGBA PNGs, like the "Jump (n).png" set)
+    frames_folder = os.path.join(folder, "frames")
+    os.makedirs(frames_folder, exist_ok=True)
+    for i in range(8):
+        frame = Image.fromarray(np.roll(image, i * width // 8, axis=1)).convert("RGBA")
+        frame.save(os.path.join(frames_folder, f"frame_{i:02d}.png"))
+
+    # Folder of copies for BatchImageEditor
+    batch_folder = os.path.join(folder, "batch")
+    os.makedirs(batch_folder, exist_ok=True)
+    for i in range(4):
+        shutil.copy(image_path, os.path.join(batch_folder, f"image_{i}.jpg"))
+
+    return {"image": image_path, "frames": frames_folder, "batch": batch_folder, "out": os.path.join(folder, "out")}
+
+
+class CaseSkipped(Exception):
+    """Raised by a setup when its case cannot run on this machine (e.g. a missing font)."""
+
+
+def synthetic_video(paths: dict, frames: int = 4) -> str:
+    """Short MP4 of the synthetic image panning sideways, written once per resolution."""
+    path = os.path.join(os.path.dirname(paths["image"]), "synthetic.mp4")
+    if not os.path.exists(path):
+        image = cv2.imread(paths["image"])
+        height, width = image.shape[:2]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 25, (width, height))
+        for i in range(frames):
+            writer.write(np.roll(image, i * 8, axis=1))
+        writer.release()
+    return path
+
+
+def headless(cls, **attributes):
+    """Build an instance without running __init__ (several classes open a Tk window there)."""
+    instance = cls.__new__(cls)
+    instance.__dict__.update(attributes)
+    return instance
+
+
+# --------------------------------------------
+# Benchmark cases
+# Each setup receives the input paths and returns the callable that is timed.
+# Imports live inside the setup so a missing optional dependency only skips that case.
+# --------------------------------------------
+def setup_clahe(paths):
+    from open_cv_CLAHE_hist_equalization_github import CLAHEMethod
+    app = CLAHEMethod(paths["image"], paths["out"], "clahe.jpg")
+    return app.enhance_image
+
+
+def setup_clahe_video(paths, temporal: bool):
+    from open_cv_CLAHE_hist_equalization_github import TemporalCLAHE, enhance_colorful
+    image = cv2.imread(paths["image"])
+    clahe = TemporalCLAHE()
+    process = clahe.process if temporal else enhance_colorful
+    # One refresh interval per call, so the LUT rebuilds are counted at their real rate
+    return lambda: [process(image) for _ in range(clahe.refresh_interval)]
+
+
+def setup_circle_detector(paths):
+    from open_cv_circle_detection_github import CircleDetector
+    image = cv2.imread(paths["image"])
+    app = headless(CircleDetector, image=image, output=image.copy(), folder_name=paths["out"])
+    os.makedirs(paths["out"], exist_ok=True)
+    return app.detect_circles
+
+
+def setup_corner_detector(paths):
+    from open_cv_corner_detection import CornerDetector
+    app = CornerDetector(paths["image"], paths["out"])
+    return lambda: (app.detect_corners(), app.draw_on_original_and_save())
+
+
+def setup_face_detector(paths):
+    from open_cv_face_detection_github import FaceDetector
+    if not hasattr(cv2, "CascadeClassifier"):
+        raise CaseSkipped("this OpenCV build has no Haar cascades (cv2.CascadeClassifier)")
+    app = FaceDetector(paths["image"], paths["out"])
+    return app.detect_face
+
+
+def setup_denoise(paths):
+    from open_cv_denoising_github import DenoiseImage
+    app = headless(DenoiseImage, image=cv2.imread(paths["image"]), folder_name=paths["out"])
+    os.makedirs(paths["out"], exist_ok=True)
+    return app.apply_denoise
+
+
+def setup_denoise_tiled(paths):
+    from open_cv_denoising_github import DenoiseImage
+    app = headless(DenoiseImage, image=cv2.imread(paths["image"]), folder_name=paths["out"])
+    return lambda: app.denoise_tiled(tile_size=512)
+
+
+def setup_denoise_video(paths):
+    from open_cv_denoising_github import denoise_video
+    video = synthetic_video(paths)
+    return lambda: denoise_video(video, os.path.join(paths["out"], "denoised.mp4"), temporal_window=3)
+
+
+def setup_edges(paths):
+    from open_cv_edge_detection_github import EdgeDetection
+    app = EdgeDetection(paths["image"], paths["out"])
+    return app.detect_edges
+
+
+def setup_morphology(paths):
+    from open_cv_morphology_ops_github import MorphologyOps
+    app = headless(MorphologyOps, image=cv2.imread(paths["image"], cv2.IMREAD_GRAYSCALE), folder_name=paths["out"])
+    os.makedirs(paths["out"], exist_ok=True)
+    return lambda: (app.erosion(), app.dilation())
+
+
+def setup_color_filter(paths):
+    from open_cv_filter_color_github import ColorFilter
+    app = headless(
+        ColorFilter, image=cv2.imread(paths["image"]), folder_name=paths["out"],
+        lower_color=np.array([60, 35, 140]), upper_color=np.array([180, 255, 255]),
+    )
+    os.makedirs(paths["out"], exist_ok=True)
+    return app.apply_filter
+
+
+def setup_color_palette(paths, mode: str = "full"):
+    from open_cv_color_palette_github import MyColorPalette
+    app = MyColorPalette(paths["image"], num_colors=6)
+    return lambda: app.extract_palette(mode=mode)
+
+
+def setup_histogram(paths):
+    from open_cv_color_channel_hist_github import Histogram
+    app = Histogram(paths["image"])
+    return lambda: app.histograms(luminance=True, hsv=True)
+
+
+def setup_histogram_accumulator(paths):
+    from open_cv_color_channel_hist_github import HistogramAccumulator
+    return lambda: HistogramAccumulator(luminance=True).add_folder(paths["batch"])
+
+
+def setup_enhance_folder(paths):
+    from open_cv_CLAHE_hist_equalization_github import enhance_folder
+    return lambda: enhance_folder(paths["batch"], os.path.join(paths["out"], "clahe_folder"))
+
+
+def setup_image_analyzer(paths):
+    from cached_property_image_analyzer_advanced_github import ImageAnalyzer
+    return lambda: ImageAnalyzer(paths["image"]).dominant_color  # New instance: cached_property must not hit
+
+
+def setup_image_analyzer_cached(paths):
+    from cached_property_image_analyzer_advanced_github import AnalysisCache, ImageAnalyzer
+    os.makedirs(paths["out"], exist_ok=True)
+    cache = AnalysisCache(os.path.join(paths["out"], "analyzer_cache.sqlite"))
+    return lambda: ImageAnalyzer(paths["image"], cache=cache).dominant_color  # Served from disk after the warmup
+
+
+def setup_analyze_folder(paths):
+    from cached_property_image_analyzer_advanced_github import analyze_folder
+    return lambda: analyze_folder(paths["batch"])
+
+
+def setup_exif_summary(paths):
+    from pillow_metadata_advanced_github import ExifMetadataExtractor
+    return lambda: ExifMetadataExtractor(paths["image"]).summary()
+
+
+def setup_exif_index(paths):
+    from pillow_metadata_advanced_github import ExifIndexer
+    os.makedirs(paths["out"], exist_ok=True)
+    db_path = os.path.join(paths["out"], "exif_index.sqlite")
+
+    def index():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)  # Full index every run, not a no-op refresh
+        indexer = ExifIndexer(db_path)
+        indexer.refresh(paths["batch"])
+        indexer.close()
+    return index
+
+
+def setup_gif_maker(paths, **options):
+    from pillow_gif_maker_github import GIFMaker
+    optimize = options.pop("optimize", False)
+    return lambda: GIFMaker(paths["frames"], **options).create_gif(optimize=optimize)
+
+
+def setup_batch_editor(paths, fused_geometry: bool = False, **options):
+    from pillow_batch_image_github import BatchImageEditor
+    output = os.path.join(paths["out"], "incremental") if options.get("incremental") else paths["out"]
+    editor = BatchImageEditor(paths["batch"], output, (500, 500), 30, (50, 50, 450, 450), 1.5, fused_geometry=fused_geometry)
+    return lambda: editor.process_images(**options)
+
+
+def setup_pillow_basics(paths):
+    from pillow_basics_github import PillowBasics
+    app = PillowBasics(paths["image"])
+    return lambda: app.resize_image((300, 300), "resized.jpg")
+
+
+def setup_pillow_variants(paths):
+    from pillow_basics_github import PillowBasics
+    app = PillowBasics(paths["image"])
+    specs = [
+        {"operation": "resize", "new_size": (300, 300), "filename": "variant_resized.jpg"},
+        {"operation": "rotate", "angle": 45, "filename": "variant_rotated.jpg"},
+        {"operation": "filter", "filter_type": "blur", "filename": "variant_blur.jpg"},
+        {"operation": "grayscale", "filename": "variant_grayscale.jpg"},
+    ]
+    return lambda: app.generate_variants(specs)
+
+
+def setup_pillow_effects(paths):
+    from pillow_invert_images_github import PillowEffects
+    app = PillowEffects(paths["image"], paths["out"])
+    return lambda: app.invert_colors("inverted.jpg")
+
+
+def setup_pillow_text(paths):
+    from PIL import ImageFont
+    from pillow_text_github import PillowText
+    try:
+        ImageFont.truetype("arial.ttf", 150)
+    except OSError:
+        raise CaseSkipped("font arial.ttf not found") from None
+    app = PillowText(paths["image"], paths["out"])
+    return app.run
+
+
+def setup_noise_reduction(paths):
+    from pillow_noise_reduction_github import NoiseReduction
+    app = NoiseReduction(paths["image"], paths["out"])
+    return lambda: app.noise_reduction(kernel_size=3)
+
+
+def setup_image_resizer(paths):
+    from open_cv_resize_github import ImageResizer
+    return lambda: ImageResizer(paths["image"], 0.5, paths["out"]).save_resized_image()
+
+
+def setup_enhance(paths):
+    from pillow_enhanced_images_github import PillowBasics
+    app = PillowBasics(paths["image"], paths["out"])
+    return lambda: (app.brighten_image("b.jpg"), app.color_image("c.jpg"), app.contrast_image("k.jpg"), app.sharped_image("s.jpg"))
+
+
+def setup_enhance_sweep(paths):
+    from pillow_enhanced_images_github import PillowBasics
+    app = PillowBasics(paths["image"], paths["out"])
+    factors = [0.5, 1.5, 2.5]
+    return lambda: app.enhance_sweep({"brightness": factors, "color": factors, "contrast": factors, "sharpness": factors})
+
+
+def setup_fix_resolution(paths):
+    from pillow_fix_resolution_github import ImageResolution
+    app = ImageResolution(paths["out"], paths["image"])
+    return app.higger_resolution
+
+
+def setup_fix_resolution_fused(paths):
+    from pillow_fix_resolution_github import ImageResolution
+    app = ImageResolution(paths["out"], paths["image"])
+    return app.higger_resolution_fused
+
+
+def setup_rolling(paths):
+    from pillow_image_rolling_github import PillowRolling
+    app = PillowRolling(paths["image"], paths["out"], (600, 600))
+    return lambda: (app.resize_image(), app.rolling_and_merging("rolled.jpg"))
+
+
+def setup_rolling_striped(paths):
+    from pillow_image_rolling_github import PillowRolling
+    app = PillowRolling(paths["image"], paths["out"], (600, 600))
+    app.resize_image()
+    width, height = Image.open(paths["image"]).size
+    return lambda: app.rolling_and_merging_striped("rolled.ppm", (width * 2, height * 2))
+
+
+def setup_color_change(paths):
+    from pillow_color_change_github import ColorChange
+    app = ColorChange(paths["image"], paths["out"])
+    return lambda: app.change_color((150, 255), (0, 100), (150, 255), (255, 148, 8, 255))
+
+
+COLOR_RULES = [
+    ((150, 255), (0, 100), (150, 255), (255, 148, 8, 255)),
+    ((0, 80), (0, 80), (0, 80), (20, 20, 60, 255)),
+    ((200, 255), (200, 255), (200, 255), (255, 250, 230, 255)),
+]
+
+
+def setup_color_rules(paths):
+    from pillow_color_change_github import ColorChange, ColorRuleSet
+    app = ColorChange(paths["image"], paths["out"])
+    rule_set = ColorRuleSet(COLOR_RULES)  # Compiled once, like a reused rule set
+    return lambda: app.change_colors(rule_set)
+
+
+def setup_recolor_out_of_core(paths):
+    from PIL import TiffImagePlugin
+    from pillow_color_change_github import ColorChange, ColorRuleSet
+    os.makedirs(paths["out"], exist_ok=True)
+    # Uncompressed multi-strip TIFF, as libtiff and scanners write it
+    source = os.path.join(paths["out"], "scan.tif")
+    TiffImagePlugin.WRITE_LIBTIFF = True
+    try:
+        Image.open(paths["image"]).convert("RGB").save(source, compression="raw")
+    finally:
+        TiffImagePlugin.WRITE_LIBTIFF = False
+    rule_set = ColorRuleSet(COLOR_RULES)
+    return lambda: ColorChange.recolor_out_of_core(source, os.path.join(paths["out"], "scan_recolored.tif"), rule_set)
+
+
+# name -> (setup, largest resolution the case runs at by default; None = all)
+CASES = {
+    "clahe": (setup_clahe, None),
+    "clahe_folder": (setup_enhance_folder, None),
+    "clahe_video": (lambda paths: setup_clahe_video(paths, temporal=False), None),  # enhance_colorful per frame
+    "temporal_clahe": (lambda paths: setup_clahe_video(paths, temporal=True), None),
+    "denoise": (setup_denoise, "fhd"),  # Non-Local Means: tens of seconds per run above FHD
+    "denoise_tiled": (setup_denoise_tiled, "fhd"),
+    "denoise_video": (setup_denoise_video, "vga"),  # Multi-frame Non-Local Means on every frame
+    "circle_detector": (setup_circle_detector, None),
+    "corner_detector": (setup_corner_detector, None),
+    "face_detector": (setup_face_detector, None),
+    "histogram": (setup_histogram, None),
+    "histogram_accumulator": (setup_histogram_accumulator, None),
+    "edges": (setup_edges, None),
+    "morphology": (setup_morphology, None),
+    "color_filter": (setup_color_filter, None),
+    "color_palette": (setup_color_palette, "hd"),  # Full KMeans on every pixel
+    "color_palette_histogram": (lambda paths: setup_color_palette(paths, mode="histogram"), None),
+    "color_palette_sample": (lambda paths: setup_color_palette(paths, mode="sample"), None),
+    "image_analyzer": (setup_image_analyzer, None),
+    "image_analyzer_cached": (setup_image_analyzer_cached, None),
+    "analyze_folder": (setup_analyze_folder, None),
+    "exif_summary": (setup_exif_summary, None),
+    "exif_index": (setup_exif_index, None),
+    "gif_maker": (setup_gif_maker, "fhd"),
+    "gif_streaming": (lambda paths: setup_gif_maker(paths, streaming=True), "fhd"),
+    "gif_workers": (lambda paths: setup_gif_maker(paths, workers=os.cpu_count()), "fhd"),
+    "gif_optimized": (lambda paths: setup_gif_maker(paths, optimize=True), "fhd"),
+    "batch_editor": (setup_batch_editor, None),
+    "batch_editor_fused": (lambda paths: setup_batch_editor(paths, fused_geometry=True), None),
+    "batch_editor_workers": (lambda paths: setup_batch_editor(paths, workers=os.cpu_count()), None),
+    "batch_editor_incremental": (lambda paths: setup_batch_editor(paths, incremental=True), None),  # Unchanged inputs after the warmup
+    "pillow_basics": (setup_pillow_basics, None),
+    "pillow_variants": (setup_pillow_variants, None),
+    "pillow_effects": (setup_pillow_effects, None),
+    "pillow_text": (setup_pillow_text, None),
+    "noise_reduction": (setup_noise_reduction, None),
+    "image_resizer": (setup_image_resizer, None),
+    "enhance": (setup_enhance, None),
+    "enhance_sweep": (setup_enhance_sweep, None),
+    "fix_resolution": (setup_fix_resolution, None),
+    "fix_resolution_fused": (setup_fix_resolution_fused, None),
+    "rolling": (setup_rolling, None),
+    "rolling_striped": (setup_rolling_striped, None),
+    "color_change": (setup_color_change, None),
+    "color_rules": (setup_color_rules, None),
+    "recolor_out_of_core": (setup_recolor_out_of_core, None),
+}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(name: str, paths: dict, repeat: int, warmup: int) -> dict:
+    """Time one case. Runs inside a fresh process, so the peak RSS belongs to this case alone."""
+    os.chdir(os.path.dirname(paths["image"]))  # Some classes write to relative folders
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    setup, _ = CASES[name]
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            operation = setup(paths)
+            for _ in range(warmup):
+                operation()
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                operation()
+                times.append(time.perf_counter() - start)
+    except ImportError as exc:
+        return {"status": "skipped", "error": f"missing dependency: {exc.name}"}
+    except CaseSkipped as exc:
+        return {"status": "skipped", "error": str(exc)}
+    except Exception as exc:
+        return {"status": "error", "error": f"{type(exc).__name__}: {exc}"}
+
+    return {
+        "status": "ok",
+        "times_s": [round(t, 6) for t in times],
+        "median_s": round(statistics.median(times), 6),
+        "min_s": round(min(times), 6),
+        "mean_s": round(statistics.fmean(times), 6),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _run_case_into(connection, name: str, paths: dict, repeat: int, warmup: int):
+    connection.send(run_case(name, paths, repeat, warmup))
+    connection.close()
+
+
+def run_isolated(name: str, paths: dict, repeat: int, warmup: int) -> dict:
+    # A plain (non-daemonic) process: cases like enhance_folder start process pools of their own
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case_into, args=(sender, name, paths, repeat, warmup))
+    process.start()
+    sender.close()
+    try:
+        return receiver.recv()
+    except EOFError:
+        return {"status": "error", "error": f"case process exited with code {process.exitcode}"}
+    finally:
+        process.join()
+
+
+def compare_with_baseline(results: list[dict], baseline_path: str, tolerance: float) -> list[str]:
+    """Return a message for every case that is more than `tolerance` slower than the baseline median."""
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = {(r["case"], r["resolution"]): r for r in json.load(file)["results"] if r["status"] == "ok"}
+
+    regressions = []
+    for result in results:
+        reference = baseline.get((result["case"], result["resolution"]))
+        if result["status"] != "ok" or reference is None:
+            continue
+        ratio = result["median_s"] / reference["median_s"]
+        result["baseline_ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{result['case']}@{result['resolution']}: {reference['median_s'] * 1000:.1f} ms -> "
+                f"{result['median_s'] * 1000:.1f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless throughput benchmark for the image processing classes.")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=sorted(CASES), help="cases to run (default: all)")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS), help="synthetic image sizes")
+    parser.add_argument("--all-sizes", action="store_true", help="ignore the per-case size caps for the slow cases")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs before timing")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="baseline JSON to compare against; regressions exit with status 1")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown vs. baseline (0.15 = 15%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    order = list(RESOLUTIONS)
+    results = []
+
+    print("=" * 60)
+    print(f"⏱️  Benchmarking {len(args.cases)} cases x {len(args.resolutions)} resolutions (repeat={args.repeat}, warmup={args.warmup})")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory(prefix="image_bench_") as workdir:
+        for label in args.resolutions:
+            width, height = RESOLUTIONS[label]
+            paths = prepare_inputs(workdir, label, width, height)
+
+            for name in args.cases:
+                cap = CASES[name][1]
+                if cap is not None and not args.all_sizes and order.index(label) > order.index(cap):
+                    continue
+
+                result = {"case": name, "resolution": label, "width": width, "height": height}
+                result.update(run_isolated(name, paths, args.repeat, args.warmup))
+                if result["status"] == "ok":
+                    result["megapixels_per_s"] = round(width * height / 1e6 / result["median_s"], 2)
+                    print(f"✅ {name:15} {label:5} median {result['median_s'] * 1000:9.1f} ms  "
+                          f"{result['megapixels_per_s']:8.2f} MP/s  peak {result['peak_rss_mb']} MB")
+                else:
+                    print(f"⚠️ {name:15} {label:5} {result['status']}: {result['error']}")
+                results.append(result)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "pillow": Image.__version__,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) vs. {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for message in regressions:
+            print(f"   {message}")
+        return 1
+    if args.baseline:
+        print(f"✅ No regressions vs. {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
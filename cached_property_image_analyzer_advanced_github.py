@@ -1,10 +1,27 @@
-from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, wraps
 from pathlib import Path
-from collections import Counter
-from typing import Tuple
+from typing import Iterable, Tuple
+import glob
+import hashlib
+import json
+import sqlite3
+import threading
+import time
 
+import numpy as np
 from PIL import Image
 
+# Opt-in reduced-scale decoding for dominant_color: e.g. (320, 320) decodes JPEGs at the smallest
+# DCT scale that still covers this size (other formats are reduce()d by an integer factor) before
+# the 80x80 thumbnail is made. None decodes at full size, bit-identical to the old full-res path
+DOMINANT_DRAFT_SIZE = None
+
+# Part of every persistent cache entry: bump it when a cached property's algorithm changes
+ANALYSIS_VERSION = 1
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tif", ".tiff", ".webp")
+
 
 def _human_readable_size(num_bytes: int) -> str:
     """Convert bytes to a human-friendly string (KB, MB, ...)."""
@@ -20,12 +37,154 @@ def _rgb_to_hex(rgb: Tuple[int, int, int]) -> str:
     return "#{:02x}{:02x}{:02x}".format(*rgb)
 
 
+def _from_json(value):
+    """JSON turns tuples into lists; turn them back so cached results look like fresh ones."""
+    if isinstance(value, list):
+        return tuple(_from_json(item) for item in value)
+    return value
+
+
+class AnalysisCache:
+    """
+    On-disk SQLite cache for ImageAnalyzer results, shared by every process that opens the same file.
+    Entries are keyed by resolved path + property name and validated against the file's size and
+    mtime (and its SHA-256 when only the mtime moved) and against the version of the code and
+    settings that produced them. Least recently used entries are evicted once the cache holds
+    more than max_entries rows (checked every EVICT_INTERVAL puts, so it may briefly overshoot).
+    """
+
+    TOUCH_INTERVAL = 3600.0  # Refresh last_used at most once an hour, so hits stay read-only
+    EVICT_INTERVAL = 256  # Puts between two row counts
+
+    def __init__(self, db_path: str = "image_analyzer_cache.sqlite", max_entries: int = 100_000):
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        self._local = threading.local()  # sqlite3 connections must not be shared between threads
+        self._puts = 0
+        with self._connection() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(results)")]
+            if columns and "version" not in columns:
+                conn.execute("DROP TABLE results")  # Cache written before entries were versioned
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " path TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                " sha256 TEXT NOT NULL, version TEXT NOT NULL, value TEXT NOT NULL, last_used REAL NOT NULL,"
+                " PRIMARY KEY (path, name))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # WAL lets readers run while another process writes; writers wait up to 30 s for the lock
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def file_digest(path: Path) -> str:
+        """SHA-256 of a file, read in 1 MB blocks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, path: Path, name: str, version: str = ""):
+        """Return the cached value, or None when it is missing, outdated or the file changed."""
+        key = str(Path(path).resolve())
+        stat = Path(path).stat()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT size, mtime_ns, sha256, value, last_used FROM results WHERE path = ? AND name = ? AND version = ?",
+            (key, name, version),
+        ).fetchone()
+        if row is None or row[0] != stat.st_size:
+            return None
+
+        size, mtime_ns, sha256, value, last_used = row
+        now = time.time()
+        if mtime_ns != stat.st_mtime_ns:
+            if self.file_digest(path) != sha256:
+                return None
+            with conn:  # Touched but not changed: adopt the new mtime for every property of the file
+                conn.execute("UPDATE results SET mtime_ns = ?, last_used = ? WHERE path = ?", (stat.st_mtime_ns, now, key))
+        elif now - last_used > self.TOUCH_INTERVAL:
+            with conn:
+                conn.execute("UPDATE results SET last_used = ? WHERE path = ? AND name = ?", (now, key, name))
+        return _from_json(json.loads(value))
+
+    def put(self, path: Path, name: str, value, version: str = ""):
+        """Store a freshly computed value and, every EVICT_INTERVAL puts, evict the oldest entries beyond max_entries."""
+        key = str(Path(path).resolve())
+        stat = Path(path).stat()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT sha256 FROM results WHERE path = ? AND size = ? AND mtime_ns = ? LIMIT 1", (key, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        sha256 = row[0] if row is not None else self.file_digest(path)  # Hash each file version once
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, name, stat.st_size, stat.st_mtime_ns, sha256, version, json.dumps(value), time.time()),
+            )
+            self._puts += 1
+            if self._puts % self.EVICT_INTERVAL:
+                return
+            excess = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY last_used LIMIT ?)", (excess,)
+                )
+
+
+def _cache_version(name: str) -> str:
+    """ANALYSIS_VERSION plus the module settings the property depends on."""
+    if name == "dominant_color":
+        return f"{ANALYSIS_VERSION}:draft={DOMINANT_DRAFT_SIZE}"
+    return str(ANALYSIS_VERSION)
+
+
+def _persistent(func):
+    """Look the property up in the analyzer's AnalysisCache (if any) before computing it."""
+    @wraps(func)
+    def wrapper(self):
+        if self.cache is None:
+            return func(self)
+        version = _cache_version(func.__name__)
+        value = self.cache.get(self.image_path, func.__name__, version)
+        if value is None:
+            value = func(self)
+            self.cache.put(self.image_path, func.__name__, value, version)
+        return value
+    return wrapper
+
+
 class ImageAnalyzer:
     """Create a simple report about an image file."""
 
-    def __init__(self, image_path: str):
+    def __init__(self, image_path: str, cache: AnalysisCache = None):
         self.image_path = Path(image_path)
-        self.image = Image.open(self.image_path)
+        self.cache = cache  # Optional persistent cache for the expensive properties
+
+    @cached_property
+    def image(self) -> Image.Image:
+        """Opened on first use, so results served from the cache never touch the file."""
+        return Image.open(self.image_path)
+
+    def close(self) -> None:
+        """Release the file handle if the image was ever opened."""
+        if "image" in self.__dict__:
+            self.image.close()
+
+    def __enter__(self) -> "ImageAnalyzer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     # --------------------------------------------
     # Basic file & image attributes (cheap)
@@ -50,60 +209,71 @@ class ImageAnalyzer:
 
     # Expensive / derived computations (cached)
     @cached_property
+    @_persistent
     def total_pixels(self) -> int:
         """Expensive computation executed ONLY once."""
         width, height = self.image.size
         return width * height
 
     @cached_property
+    @_persistent
     def aspect_ratio(self) -> str:
         """Return aspect ratio as a rounded float (width / height)."""
         w, h = self.image.size
         return str(round(w / h, 2))
 
     @cached_property
+    @_persistent
     def dominant_color(self) -> Tuple[str, Tuple[int, int, int], float]:
         """
         Robust dominant color detection.
         Returns:
           (hex_color, (r,g,b), percentage)
         Strategy:
-          - handle alpha by compositing on white,
-          - resize to speed up,
+          - optionally downsample first (see DOMINANT_DRAFT_SIZE),
+          - handle alpha by compositing on white before the final resize,
           - reduce to an adaptive palette (e.g. 8 colors),
           - count pixels and compute percentage.
         """
-        # work on a copy so we never modify self.image
-        img = self.image.copy()
+        # Separate handle: draft() changes the decoded size, self.image must keep the real one
+        with Image.open(self.image_path) as img:
+            if DOMINANT_DRAFT_SIZE is not None:
+                img.draft("RGB", DOMINANT_DRAFT_SIZE)
 
-        # Ensure we have RGBA to detect alpha and composite if necessary
-        if img.mode != "RGBA":
-            img = img.convert("RGBA")
-
-        # Composite on white background to handle transparency cleanly
-        bg = Image.new("RGBA", img.size, (255, 255, 255, 255))
-        img = Image.alpha_composite(bg, img)
-
-        # Convert to RGB (no alpha now)
-        img = img.convert("RGB")
-
-        # Resize to speed up processing (keeps aspect)
-        small = img.resize((80, 80), Image.Resampling.LANCZOS)
+            if img.mode in ("RGB", "L"):
+                small = img.resize((80, 80), Image.Resampling.LANCZOS).convert("RGB")
+            else:
+                # Composite on white before the 80x80 resize: resizing RGBA first shifts the result
+                # (e.g. 74.38% -> 76.17% on a sprite), so only an optional integer reduce() comes first
+                img = img.convert("RGBA")
+                if DOMINANT_DRAFT_SIZE is not None:
+                    factor = min(img.width // DOMINANT_DRAFT_SIZE[0], img.height // DOMINANT_DRAFT_SIZE[1])
+                    if factor > 1:
+                        img = img.reduce(factor)
+                bg = Image.new("RGBA", img.size, (255, 255, 255, 255))
+                small = Image.alpha_composite(bg, img).convert("RGB").resize((80, 80), Image.Resampling.LANCZOS)
 
         # Reduce to an adaptive palette to cluster similar colors
-        pal = small.convert("P", palette=Image.ADAPTIVE, colors=8).convert("RGB")
+        pal = small.convert("P", palette=Image.ADAPTIVE, colors=8)
 
-        # Count colors
-        pixels = list(pal.getdata())
-        if not pixels:
+        # Count colors: pack each palette entry into one integer (merging duplicate entries),
+        # then a single bincount over the 6400 per-pixel color ids
+        indices = np.asarray(pal).ravel()
+        if indices.size == 0:
             return ("#000000", (0, 0, 0), 0.0)
+        palette = np.array(pal.getpalette(), dtype=np.uint32).reshape(-1, 3)
+        packed = (palette[:, 0] << 16) | (palette[:, 1] << 8) | palette[:, 2]
+        colors, color_ids = np.unique(packed, return_inverse=True)
+        pixel_ids = color_ids[indices]
+        counts = np.bincount(pixel_ids, minlength=len(colors))
 
-        counts = Counter(pixels)
-        most_common_rgb, most_common_count = counts.most_common(1)[0][0], counts.most_common(1)[0][1]
+        # Ties go to the color seen first, like Counter.most_common
+        tied = np.flatnonzero(counts == counts.max())
+        winner = pixel_ids[np.isin(pixel_ids, tied)][0]
+        most_common_rgb = tuple(int(v) for v in palette[np.flatnonzero(color_ids == winner)[0]])
 
         # percentage of image the dominant color covers (approx)
-        total = sum(counts.values())
-        percentage = round((most_common_count / total) * 100, 2)
+        percentage = round((int(counts[winner]) / indices.size) * 100, 2)
 
         hex_color = _rgb_to_hex(most_common_rgb)
         return (hex_color, most_common_rgb, percentage)
@@ -120,6 +290,64 @@ class ImageAnalyzer:
         print(f"- Dominant color: {hex_color} (RGB{rgb})")
 
 
+def _list_images(source: str) -> list[str]:
+    """A folder (its images, non-recursive) or a glob pattern (** allowed), in sorted order."""
+    if Path(source).is_dir():
+        return sorted(str(path) for path in Path(source).iterdir() if path.suffix.lower() in IMAGE_EXTENSIONS)
+    return sorted(path for path in glob.glob(source, recursive=True) if path.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def _analyze_row(path: str, properties: Iterable[str], cache: AnalysisCache, open_files: threading.Semaphore) -> tuple:
+    """One result row; the header is read lazily and pixels are decoded only for dominant_color."""
+    # One handle at a time per row: the header handle is closed before dominant_color opens its own,
+    # so the semaphore really bounds the open files
+    with open_files, ImageAnalyzer(path, cache=cache) as analyzer:
+        try:
+            width, height = analyzer.image.size
+            header = (analyzer.file_type, analyzer.color_mode, width, height, analyzer.total_pixels, float(analyzer.aspect_ratio))
+            analyzer.close()
+            hex_color, rgb, percentage = ("", (0, 0, 0), np.nan)
+            if "dominant_color" in properties:
+                hex_color, rgb, percentage = analyzer.dominant_color
+            return (path, analyzer.file_size_bytes, *header, hex_color, *rgb, percentage, "")
+        except Exception as exc:
+            return (path, 0, "", "", 0, 0, 0, np.nan, "", 0, 0, 0, np.nan, f"{type(exc).__name__}: {exc}")
+
+
+def analyze_folder(
+    source: str,
+    properties: Iterable[str] = ("dominant_color",),
+    workers: int = 8,
+    max_open_files: int = 64,
+    cache: AnalysisCache = None,
+) -> np.ndarray:
+    """
+    Analyze every image of a folder or glob pattern and return one NumPy structured array
+    (one row per file, in sorted path order) instead of one ImageAnalyzer per image.
+    properties: pixel-based properties to compute; pass () for a header-only scan
+    workers: threads sharing the work (Pillow decodes with the GIL released)
+    max_open_files: cap on image files open at the same time (each row holds at most one handle,
+                    so it only limits anything when it is below workers)
+    cache: optional AnalysisCache, shared by all threads
+    Files that cannot be read get an "error" message and empty values instead of stopping the scan.
+    """
+    paths = _list_images(source)
+    open_files = threading.BoundedSemaphore(max_open_files)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(lambda path: _analyze_row(path, tuple(properties), cache, open_files), paths))
+
+    def text(column: int) -> str:
+        return f"U{max([len(row[column]) for row in rows], default=0) or 1}"
+
+    dtype = [
+        ("path", text(0)), ("file_size", "i8"), ("format", text(2)), ("mode", text(3)),
+        ("width", "i4"), ("height", "i4"), ("total_pixels", "i8"), ("aspect_ratio", "f8"),
+        ("dominant_hex", "U7"), ("dominant_r", "u1"), ("dominant_g", "u1"), ("dominant_b", "u1"),
+        ("dominant_pct", "f8"), ("error", text(13)),
+    ]
+    return np.array(rows, dtype=dtype)
+
+
 def main():
     # Adjust the filename as needed. Example uses 'sample.jpg' same as your original code.
     analyzer = ImageAnalyzer("sample.jpg")
@@ -133,6 +361,17 @@ def main():
     print("Aspect ratio (cached):", analyzer.aspect_ratio)
     print("Dominant color (cached):", analyzer.dominant_color)
 
+    # Persistent cache: a later run (or another process) gets these results from disk
+    cache = AnalysisCache("image_analyzer_cache.sqlite")
+    print("\n--- PERSISTENT CACHE ---")
+    print("Dominant color (disk cache):", ImageAnalyzer("sample.jpg", cache=cache).dominant_color)
+
+    # Whole folder (or glob pattern) at once: one structured array, one row per image
+    results = analyze_folder("input_images", cache=cache)
+    print("\n--- FOLDER REPORT ---")
+    for row in results:
+        print(f"- {Path(row['path']).name}: {row['width']} x {row['height']}, dominant {row['dominant_hex']}")
+
 
 if __name__ == "__main__":
     main()
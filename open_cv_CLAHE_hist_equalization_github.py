@@ -1,6 +1,252 @@
 import cv2
 import os
+import queue
+import threading
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+_clahe_cache = {}  # (clipLimit, tileGridSize) -> CLAHE object, one set per process
+
+
+def get_clahe(clip_limit: float, tile_grid_size: tuple[int, int]):
+    """Return a cached CLAHE object instead of creating one per image."""
+    key = (clip_limit, tuple(tile_grid_size))
+    if key not in _clahe_cache:
+        _clahe_cache[key] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=key[1])
+    return _clahe_cache[key]
+
+
+def is_grayscale(image: np.ndarray, band_rows: int = 256) -> bool:
+    """
+    True when all three channels are equal. A sparse sample of rows is checked first, so most
+    color images are rejected almost immediately; otherwise bands are compared until one differs.
+    No full-size temporaries are created.
+    """
+    if image.ndim == 2 or image.shape[2] == 1:
+        return True
+    step = max(1, image.shape[0] // 32)
+    for rows in (slice(0, None, step), *(slice(top, top + band_rows) for top in range(0, image.shape[0], band_rows))):
+        band = image[rows]
+        if not (np.array_equal(band[..., 0], band[..., 1]) and np.array_equal(band[..., 1], band[..., 2])):
+            return False
+    return True
+
+
+def enhance_grayscale(image: np.ndarray) -> np.ndarray:
+    # With equal channels BGR2GRAY returns the channel itself, so just take it
+    gray = image if image.ndim == 2 else cv2.extractChannel(image, 0)
+    enhanced = get_clahe(3.0, (8, 8)).apply(gray)  # Apply CLAHE to the grayscale image
+    return cv2.cvtColor(enhanced, cv2.COLOR_GRAY2BGR)  # Convert back for consistency
+
+
+def enhance_colorful(image: np.ndarray) -> np.ndarray:
+    # Convert BGR to YCrCb (for colorful images)
+    ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
+
+    # Enhance only the luminance (Y) channel in place; Cr and Cb are never split out
+    ycrcb[..., 0] = get_clahe(2.0, (6, 6)).apply(cv2.extractChannel(ycrcb, 0))
+    return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+
+
+def enhance(image: np.ndarray, upscale: bool = False) -> np.ndarray:
+    """Same result as CLAHEMethod.enhance_image, without the per-file object."""
+    enhanced = enhance_grayscale(image) if is_grayscale(image) else enhance_colorful(image)
+    if upscale:
+        h, w = enhanced.shape[:2]
+        enhanced = cv2.resize(enhanced, (w * 2, h * 2), interpolation=cv2.INTER_CUBIC)
+    return enhanced
+
+
+def _enhance_file(input_path: str, output_path: str, upscale: bool) -> tuple[str, str]:
+    image = cv2.imread(input_path)
+    if image is None:
+        return input_path, "unreadable image"
+    if not cv2.imwrite(output_path, enhance(image, upscale)):
+        return input_path, f"could not write {output_path}"
+    return input_path, None
+
+
+def enhance_folder(input_folder: str, output_folder: str, upscale: bool = False, workers: int = None) -> list[tuple[str, str]]:
+    """
+    Enhance every image of a folder on a process pool (None = all cores); each worker keeps its
+    own CLAHE objects. Returns (input_path, error or None) per file, in sorted order.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    filenames = sorted(name for name in os.listdir(input_folder) if name.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")))
+    inputs = [os.path.join(input_folder, name) for name in filenames]
+    outputs = [os.path.join(output_folder, f"lighted_{name}") for name in filenames]
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_enhance_file, inputs, outputs, [upscale] * len(inputs)))
+
+    for input_path, error in results:
+        if error is not None:
+            print(f"❌ Failed: {input_path} ({error})")
+    elapsed = time.perf_counter() - start
+    done = sum(error is None for _, error in results)
+    print(f"📊 {done}/{len(results)} images in {elapsed:.2f} s ({done / elapsed if elapsed > 0 else 0.0:.2f} images/sec)")
+    return results
+
+class TemporalCLAHE:
+    """
+    CLAHE on the Y channel of a video (as enhance_colorful does) that does not flicker.
+    The steps of OpenCV's CLAHE are done here so their state can be kept between frames:
+    tile histograms are blended into an exponential moving average every refresh_interval frames,
+    the clipped LUTs are rebuilt from that average, and the frames in between only apply the
+    cached LUTs. With smoothing=1 and refresh_interval=1 the output matches cv2.createCLAHE
+    to within 1 gray level.
+    """
+
+    def __init__(self, clip_limit: float = 2.0, tile_grid_size: tuple[int, int] = (6, 6), smoothing: float = 0.2, refresh_interval: int = 5):
+        if tile_grid_size[1] * 256 >= 32767:  # cv2.remap limit on the LUT texture, see apply()
+            raise ValueError(f"⚠️ At most 127 tile rows are supported, got {tile_grid_size[1]}")
+        self.clip_limit = clip_limit
+        self.tile_grid_size = tile_grid_size  # (columns, rows) like OpenCV
+        self.smoothing = smoothing  # Weight of the newest histograms in the moving average
+        self.refresh_interval = refresh_interval
+        self.histograms = None  # (tiles, 256) moving average
+        self.luts = None  # (rows, columns, 256) uint8
+        self.frame_index = 0
+        self._texture = None  # The LUTs as a (256 * rows, columns) image, see apply()
+        self._layout = None  # Per-frame-size tile geometry and remap coordinates
+
+    @staticmethod
+    def _axis(length: int, tile: int, count: int) -> np.ndarray:
+        """Position of every pixel in tile units along one axis, clamped to the outer tile centers."""
+        position = np.arange(length, dtype=np.float32) * np.float32(1.0 / tile) - 0.5
+        return np.clip(position, 0, count - 1)
+
+    def _frame_layout(self, shape: tuple[int, int]):
+        if self._layout is None or self._layout[0] != shape:
+            columns, rows = self.tile_grid_size
+            height, width = shape
+            # Same padding rule as OpenCV: pad both axes when either is not divisible
+            padding = (0, 0) if height % rows == 0 and width % columns == 0 else (rows - height % rows, columns - width % columns)
+            tile = ((height + padding[0]) // rows, (width + padding[1]) // columns)
+            map_x = np.ascontiguousarray(np.broadcast_to(self._axis(width, tile[1], columns)[None, :], shape))
+            row_y = np.ascontiguousarray(np.broadcast_to(self._axis(height, tile[0], rows)[:, None], shape))
+            level_y = np.arange(256, dtype=np.float32) * rows  # First texture row of each gray level
+            map_y = np.empty(shape, dtype=np.float32)  # Rewritten every frame, allocated once
+            self._layout = (shape, padding, tile, map_x, row_y, level_y, map_y)
+        return self._layout
+
+    def update(self, y: np.ndarray):
+        """Blend this frame's tile histograms into the average and rebuild the clipped LUTs."""
+        columns, rows = self.tile_grid_size
+        _, padding, tile, *_ = self._frame_layout(y.shape)
+        if padding != (0, 0):
+            y = cv2.copyMakeBorder(y, 0, padding[0], 0, padding[1], cv2.BORDER_REFLECT_101)
+
+        # One calcHist per tile view: no copies, and several times faster than a keyed bincount
+        histograms = np.stack([
+            cv2.calcHist([y[row * tile[0]:(row + 1) * tile[0], column * tile[1]:(column + 1) * tile[1]]], [0], None, [256], [0, 256]).ravel()
+            for row in range(rows) for column in range(columns)
+        ]).astype(np.float64)
+        if self.histograms is None or self.histograms.shape != histograms.shape:
+            self.histograms = histograms
+        else:
+            self.histograms += self.smoothing * (histograms - self.histograms)
+
+        # Clip and redistribute like OpenCV: an even share for every bin, the remainder spread out
+        area = tile[0] * tile[1]
+        limit = max(int(self.clip_limit * area / 256), 1)
+        clipped = np.minimum(self.histograms, limit)
+        excess = (self.histograms - clipped).sum(axis=1)
+        batch = np.floor(excess / 256)
+        clipped += batch[:, None]
+        for index, residual in enumerate(np.rint(excess - batch * 256).astype(int)):
+            if residual > 0:
+                step = max(256 // residual, 1)
+                clipped[index, :residual * step:step] += 1
+
+        lut = np.rint(np.cumsum(clipped, axis=1) * (255.0 / area))
+        self.luts = np.clip(lut, 0, 255).astype(np.uint8).reshape(rows, columns, 256)
+        # Texture pixel (level * rows + row, column) = luts[row, column, level]
+        self._texture = np.ascontiguousarray(self.luts.transpose(2, 0, 1)).reshape(256 * rows, columns)
+
+    def apply(self, y: np.ndarray) -> np.ndarray:
+        """
+        Map Y through the cached LUTs, bilinearly blending the four nearest tiles, with one cv2.remap:
+        the texture holds a rows x columns block of LUT values per gray level, so sampling it bilinearly
+        at (tile x, level * rows + tile y) is exactly the 4-tile blend.
+        """
+        _, _, _, map_x, row_y, level_y, map_y = self._frame_layout(y.shape)
+        cv2.LUT(y, level_y, dst=map_y)
+        cv2.add(map_y, row_y, dst=map_y)
+        return cv2.remap(self._texture, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+    def process(self, frame: np.ndarray) -> np.ndarray:
+        """Enhance one BGR frame; LUTs are refreshed every refresh_interval frames."""
+        ycrcb = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb)
+        y = cv2.extractChannel(ycrcb, 0)
+        if self.luts is None or self.frame_index % self.refresh_interval == 0:
+            self.update(y)
+        self.frame_index += 1
+        ycrcb[..., 0] = self.apply(y)
+        return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+
+
+def enhance_video(input_path: str, output_path: str, upscale: bool = False, buffer_frames: int = 8, **clahe_options) -> int:
+    """
+    Stream a video through TemporalCLAHE. Decoding and encoding run on their own threads
+    connected by queues of at most buffer_frames frames, so memory stays bounded.
+    clahe_options go to TemporalCLAHE (clip_limit, tile_grid_size, smoothing, refresh_interval).
+    Returns the number of frames written.
+    """
+    capture = cv2.VideoCapture(input_path)
+    if not capture.isOpened():
+        raise FileNotFoundError(f"⚠️ Video not found at path: {input_path}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+    width, height = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    scale = 2 if upscale else 1
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width * scale, height * scale))
+    if not writer.isOpened():
+        capture.release()
+        raise OSError(f"⚠️ Cannot write video: {output_path}")
+
+    frames_in, frames_out = queue.Queue(buffer_frames), queue.Queue(buffer_frames)
+    stop = threading.Event()  # Set when processing fails, so the reader does not block forever
+
+    def read():
+        while not stop.is_set():
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames_in.put(frame)
+        frames_in.put(None)
+
+    def write():
+        while (frame := frames_out.get()) is not None:
+            writer.write(frame)
+
+    reader, writer_thread = threading.Thread(target=read), threading.Thread(target=write)
+    reader.start()
+    writer_thread.start()
+    clahe = TemporalCLAHE(**clahe_options)
+    start = time.perf_counter()
+    try:
+        while (frame := frames_in.get()) is not None:
+            enhanced = clahe.process(frame)
+            if upscale:
+                enhanced = cv2.resize(enhanced, (width * scale, height * scale), interpolation=cv2.INTER_CUBIC)
+            frames_out.put(enhanced)
+    finally:
+        stop.set()
+        while reader.is_alive():  # Drain so a reader blocked on a full queue can finish
+            try:
+                frames_in.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        frames_out.put(None)
+        writer_thread.join()
+        capture.release()
+        writer.release()
+
+    elapsed = time.perf_counter() - start
+    print(f"🎞️ Enhanced video saved: {output_path} ({clahe.frame_index} frames, {clahe.frame_index / elapsed if elapsed > 0 else 0.0:.1f} fps)")
+    return clahe.frame_index
 
 class CLAHEMethod:
     def __init__(self, image_path: str, folder_name: str, filename: str, upscale=False):
@@ -12,7 +258,7 @@ class CLAHEMethod:
         os.makedirs(self.folder_name, exist_ok=True)  # Create folder if it doesn't exist
         self.filename = filename
         self.upscale = upscale
-        self.is_gray = self.image.shape[2] == 1 or np.array_equal(self.image[..., 0], self.image[..., 1]) and np.array_equal(self.image[..., 1], self.image[..., 2])
+        self.is_gray = is_grayscale(self.image)
 
     def enhance_image(self):
         if self.is_gray:
@@ -24,26 +270,10 @@ class CLAHEMethod:
             self.enhanced_image = self.upscale_with_opencv(self.enhanced_image)
 
     def low_light_grayscale(self):
-        gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)  # Convert image to grayscale
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))  # Create CLAHE object for enhancement
-        enhanced = clahe.apply(gray)  # Apply CLAHE to the grayscale image
-        self.enhanced_image = cv2.cvtColor(enhanced, cv2.COLOR_GRAY2BGR)  # Convert back for consistency
+        self.enhanced_image = enhance_grayscale(self.image)
 
     def low_light_colorful(self):
-        # Convert BGR to YCrCb (for colorful images)
-        ycrcb = cv2.cvtColor(self.image, cv2.COLOR_BGR2YCrCb)
-        y, cr, cb = cv2.split(ycrcb)  # Split the channels
-
-        # Enhance only the luminance (Y) channel using CLAHE
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(6, 6))
-        y_clahe = clahe.apply(y)
-
-        # Merge the enhanced Y channel back with the Cr and Cb channels
-        ycrcb_clahe = cv2.merge([y_clahe, cr, cb])
-        enhanced = cv2.cvtColor(ycrcb_clahe, cv2.COLOR_YCrCb2BGR)
-
-        # Apply slight lighting enhancement
-        self.enhanced_image = cv2.addWeighted(enhanced, 1, self.image, 0, 0)
+        self.enhanced_image = enhance_colorful(self.image)
 
     def upscale_with_opencv(self, image, scale_factor=2):
         # Upscale the image using OpenCV's resize method
@@ -88,5 +318,12 @@ def main():
     app.enhance_image()  # Enhance the image
     app.show()  # Display the image
 
+    # Batch mode: a whole folder on a process pool, no windows
+    enhance_folder("input_images", folder_name)
+
+    # Video mode: temporally smoothed CLAHE, streamed frame by frame
+    if os.path.exists("low_light_video.mp4"):
+        enhance_video("low_light_video.mp4", os.path.join(folder_name, "lighted_video.mp4"))
+
 if __name__ == "__main__":
     main()
@@ -2,6 +2,169 @@ import cv2
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+
+def channel_names(luminance: bool = False, hsv: bool = False) -> list[str]:
+    """Row order of the arrays returned by channel_histograms."""
+    return ["b", "g", "r"] + (["y"] if luminance else []) + (["h", "s", "v"] if hsv else [])
+
+
+def channel_histograms(image: np.ndarray, luminance: bool = False, hsv: bool = False, chunk_rows: int = 512) -> np.ndarray:
+    """
+    256-bin histograms of a BGR image as a (C, 256) int64 array, rows in channel_names order.
+    luminance: add Y (OpenCV's BGR2GRAY weights)
+    hsv: add H, S, V (H scaled to 0-255 with BGR2HSV_FULL so every channel has 256 bins)
+    The image is read once, in bands of chunk_rows rows (a np.memmap works too): each band is
+    converted and counted while it is still in cache, and the band counts are summed.
+    """
+    channels = len(channel_names(luminance, hsv))
+    counts = np.zeros((channels, 256), dtype=np.int64)
+
+    for top in range(0, image.shape[0], chunk_rows):
+        band = np.ascontiguousarray(image[top:top + chunk_rows])
+        planes = [band]
+        if luminance:
+            planes.append(cv2.cvtColor(band, cv2.COLOR_BGR2GRAY))
+        if hsv:
+            planes.append(cv2.cvtColor(band, cv2.COLOR_BGR2HSV_FULL))
+
+        row = 0
+        for plane in planes:
+            for channel in range(1 if plane.ndim == 2 else plane.shape[2]):
+                counts[row] += cv2.calcHist([plane], [channel], None, [256], [0, 256]).ravel().astype(np.int64)
+                row += 1
+
+    return counts
+
+
+def _file_histograms(path: str, luminance: bool, hsv: bool, chunk_rows: int):
+    image = cv2.imread(path)
+    return None if image is None else channel_histograms(image, luminance, hsv, chunk_rows)
+
+
+def batch_histograms(source: str, luminance: bool = False, hsv: bool = False, workers: int = None, chunk_rows: int = 512) -> tuple[list[str], np.ndarray]:
+    """
+    Channel histograms of every image in a folder, computed on a process pool (None = all cores).
+    Returns (paths, array of shape (N, C, 256)) in sorted path order; unreadable files are skipped.
+    """
+    paths = sorted(str(path) for path in Path(source).iterdir() if path.suffix.lower() in IMAGE_EXTENSIONS)
+    channels = len(channel_names(luminance, hsv))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_file_histograms, paths, [luminance] * len(paths), [hsv] * len(paths), [chunk_rows] * len(paths)))
+
+    done = []
+    for path, hist in zip(paths, results):
+        if hist is None:
+            print(f"❌ Could not read: {path}")
+        else:
+            done.append((path, hist))
+    stacked = np.stack([hist for _, hist in done]) if done else np.zeros((0, channels, 256), dtype=np.int64)
+    return [path for path, _ in done], stacked
+
+
+class HistogramAccumulator:
+    """
+    Running channel histograms over any number of images or video frames.
+    Only the (C, 256) counts are kept, so partial accumulators from separate workers can be
+    merged, saved and loaded, and statistics come straight from the merged counts.
+    """
+
+    def __init__(self, luminance: bool = False, hsv: bool = False):
+        self.luminance = luminance
+        self.hsv = hsv
+        self.channels = channel_names(luminance, hsv)
+        self.counts = np.zeros((len(self.channels), 256), dtype=np.int64)
+        self.images = 0  # Images / frames added
+
+    def add(self, image: np.ndarray, chunk_rows: int = 512) -> "HistogramAccumulator":
+        """Add one BGR image or frame."""
+        self.counts += channel_histograms(image, self.luminance, self.hsv, chunk_rows)
+        self.images += 1
+        return self
+
+    def add_histograms(self, hists: np.ndarray) -> "HistogramAccumulator":
+        """Add precomputed (C, 256) or (N, C, 256) histograms, e.g. from batch_histograms."""
+        hists = np.asarray(hists, dtype=np.int64)
+        if hists.ndim == 2:
+            hists = hists[None]
+        if hists.shape[1:] != self.counts.shape:
+            raise ValueError(f"Expected histograms of shape (N, {len(self.channels)}, 256), got {hists.shape}")
+        self.counts += hists.sum(axis=0)
+        self.images += len(hists)
+        return self
+
+    def add_folder(self, source: str, workers: int = None) -> "HistogramAccumulator":
+        """Add every image of a folder, computed on a process pool."""
+        _, hists = batch_histograms(source, self.luminance, self.hsv, workers)
+        return self.add_histograms(hists)
+
+    def add_video(self, video_path: str, frame_step: int = 1) -> "HistogramAccumulator":
+        """Add every frame_step-th frame of a video."""
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            raise FileNotFoundError(f"⚠️ Video not found or unreadable: {video_path}")
+        index = 0
+        try:
+            while True:
+                if index % frame_step == 0:
+                    ok, frame = capture.read()
+                    if ok:
+                        self.add(frame)
+                else:
+                    ok = capture.grab()  # Skip without decoding into an array
+                if not ok:
+                    break
+                index += 1
+        finally:
+            capture.release()
+        return self
+
+    def merge(self, other: "HistogramAccumulator") -> "HistogramAccumulator":
+        """Fold another accumulator (e.g. from another worker) into this one."""
+        if other.channels != self.channels:
+            raise ValueError(f"Cannot merge channels {other.channels} into {self.channels}")
+        self.counts += other.counts
+        self.images += other.images
+        return self
+
+    def save(self, path: str):
+        np.savez_compressed(path, counts=self.counts, channels=np.array(self.channels), images=self.images)
+
+    @classmethod
+    def load(cls, path: str) -> "HistogramAccumulator":
+        with np.load(path) as data:
+            channels = [str(name) for name in data["channels"]]
+            accumulator = cls(luminance="y" in channels, hsv="h" in channels)
+            if accumulator.channels != channels:
+                raise ValueError(f"Unknown channel layout in {path}: {channels}")
+            accumulator.counts = data["counts"].astype(np.int64)
+            accumulator.images = int(data["images"])
+        return accumulator
+
+    def percentile(self, q) -> np.ndarray:
+        """Per-channel lowest intensity with at least q% of pixels at or below it (scalar -> (C,), sequence -> (C, len(q)))."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        targets = np.asarray(q, dtype=np.float64) / 100.0
+        result = np.array([np.searchsorted(row, np.maximum(targets * row[-1], 1), side="left") for row in cumulative])
+        return np.minimum(result, 255)
+
+    def mean(self) -> np.ndarray:
+        """Per-channel mean intensity."""
+        totals = self.counts.sum(axis=1)
+        return (self.counts @ np.arange(256)) / np.maximum(totals, 1)
+
+    def entropy(self) -> np.ndarray:
+        """Per-channel Shannon entropy in bits."""
+        probabilities = self.counts / np.maximum(self.counts.sum(axis=1, keepdims=True), 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(probabilities > 0, probabilities * np.log2(probabilities), 0.0)
+        return -terms.sum(axis=1)
+
 
 class Histogram:
     def __init__(self, image_path: str):
@@ -18,6 +181,10 @@ class Histogram:
             num /= 1000.0
         return f"{num:.0f}T"
 
+    def histograms(self, luminance: bool = False, hsv: bool = False, chunk_rows: int = 512) -> np.ndarray:
+        """Headless: the channel histograms as data, see channel_histograms."""
+        return channel_histograms(self.image, luminance, hsv, chunk_rows)
+
     def color_channel_hist(self):
         plt.figure(figsize=(10, 5))
         max_val = 0
@@ -47,5 +214,17 @@ def main():
     hist_app = Histogram(image_path=image_path)
     hist_app.color_channel_hist()
 
+    # Headless: histograms as data, e.g. for exposure checks on every ingested image
+    hists = hist_app.histograms(luminance=True)
+    print("📊 Channels:", channel_names(luminance=True), "shape:", hists.shape)
+    paths, batch = batch_histograms("input_images", luminance=True)
+    print(f"📊 {len(paths)} images -> {batch.shape}")
+
+    # Corpus statistics: accumulate, merge partial results, save for the next run
+    total = HistogramAccumulator(luminance=True).add_histograms(batch)
+    total.merge(HistogramAccumulator(luminance=True).add(hist_app.image))
+    total.save("histogram_totals.npz")
+    print("📊 Mean:", np.round(total.mean(), 1), "Median:", total.percentile(50), "Entropy:", np.round(total.entropy(), 2))
+
 if __name__ == "__main__":
     main()
@@ -1,6 +1,6 @@
 import cv2
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 import matplotlib.pyplot as plt
 
 class MyColorPalette:
@@ -12,15 +12,72 @@ class MyColorPalette:
             raise FileNotFoundError(f"⚠️ Image not found: {self.image_path}")
         self.image = cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
 
-    def extract_palette(self):
+    def extract_palette(self, mode: str = "full", sample_size: int = 200_000, percentages: bool = True):
+        """
+        mode:
+          "full"      - KMeans on every pixel (slow on large photos)
+          "histogram" - KMeans on the occupied cells of a 32x32x32 color histogram, weighted by pixel count
+          "sample"    - MiniBatchKMeans on a uniform random sample of sample_size pixels
+        percentages: in the fast modes, label the full image (chunked, through the color histogram)
+                     to get each color's share; skip it when only the colors are needed
+        """
         reshaped_image = self.image.reshape((-1, 3))
 
         print("Colors are being analyzed...")
-        kmeans = KMeans(n_clusters=self.num_colors, n_init=10)
-        kmeans.fit(reshaped_image)
+        if mode == "full":
+            kmeans = KMeans(n_clusters=self.num_colors, n_init=10)
+            kmeans.fit(reshaped_image)
+
+            self.colors = kmeans.cluster_centers_.astype(int)
+            self.percentages = np.bincount(kmeans.labels_) / len(kmeans.labels_)
+            return
+
+        if mode == "histogram":
+            counts = self._cell_counts(reshaped_image)
+            points, weights = self._cell_colors(np.flatnonzero(counts)), counts[counts > 0]
+            kmeans = KMeans(n_clusters=min(self.num_colors, len(points)), n_init=10)
+            kmeans.fit(points, sample_weight=weights)
+        elif mode == "sample":
+            counts = None
+            rng = np.random.default_rng(0)
+            count = min(sample_size, len(reshaped_image))
+            points = reshaped_image[rng.choice(len(reshaped_image), size=count, replace=False)].astype(np.float32)
+            kmeans = MiniBatchKMeans(n_clusters=self.num_colors, n_init=3, batch_size=4096, random_state=0)
+            kmeans.fit(points)
+        else:
+            raise ValueError("Mode must be 'full', 'histogram' or 'sample'")
 
         self.colors = kmeans.cluster_centers_.astype(int)
-        self.percentages = np.bincount(kmeans.labels_) / len(kmeans.labels_)
+        if percentages:
+            if counts is None:
+                counts = self._cell_counts(reshaped_image)
+            self.percentages = self._label_shares(counts, kmeans.cluster_centers_)
+        else:
+            self.percentages = np.full(len(self.colors), 1.0 / len(self.colors))  # Unknown: equal widths for show_palette
+
+    @staticmethod
+    def _cell_counts(pixels: np.ndarray, chunk_size: int = 1 << 20) -> np.ndarray:
+        """Pixel count of each 8x8x8-value color cell (32x32x32 histogram), in one chunked pass."""
+        counts = np.zeros(1 << 15, dtype=np.int64)
+        for start in range(0, len(pixels), chunk_size):
+            chunk = pixels[start:start + chunk_size] >> 3
+            cells = chunk[:, 0].astype(np.uint16) << 10
+            cells |= chunk[:, 1].astype(np.uint16) << 5
+            cells |= chunk[:, 2]
+            counts += np.bincount(cells, minlength=1 << 15)
+        return counts
+
+    @staticmethod
+    def _cell_colors(cells: np.ndarray) -> np.ndarray:
+        """Center color of histogram cells."""
+        return np.stack([(cells >> 10) & 31, (cells >> 5) & 31, cells & 31], axis=1) * 8.0 + 3.5
+
+    def _label_shares(self, counts: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """Share of the image nearest to each center; every pixel is labeled through its histogram cell."""
+        cells = np.flatnonzero(counts)
+        colors = self._cell_colors(cells)
+        labels = ((colors[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        return np.bincount(labels, weights=counts[cells], minlength=len(centers)) / counts.sum()
 
     def show_palette(self):
         if not hasattr(self, "colors"):
@@ -44,8 +101,8 @@ class MyColorPalette:
         hex_colors = ['#%02x%02x%02x' % tuple(color) for color in self.colors]
         return hex_colors
 
-    def run(self):
-        self.extract_palette()
+    def run(self, mode: str = "full"):
+        self.extract_palette(mode=mode)
         self.show_palette()
         
         print("🌈 Palette Hex Codes :")
@@ -61,7 +118,7 @@ def main():
     num_colors = 6
 
     palette_app = MyColorPalette(image_path=image_path, num_colors=num_colors)
-    palette_app.run()
+    palette_app.run(mode="histogram")  # "full" clusters every pixel: much slower on large photos
     
 if __name__ == "__main__":
     main()
@@ -1,16 +1,29 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
 class PillowBasics:
     def __init__(self, image_path: str):
+        self.image_path = image_path
         self.image = Image.open(image_path)
         os.makedirs("edited_images", exist_ok=True)  #Create Directory
 
     def show_image(self):
         self.image.show()
 
+    def open_for_size(self, target_size: tuple):
+        """
+        Open a fresh copy of the image decoded at reduced resolution when the target is much smaller.
+        JPEG can decode straight to 1/2, 1/4 or 1/8 scale; other formats are returned unchanged.
+        """
+        image = Image.open(self.image_path)
+        image.draft(None, (target_size[0] * 2, target_size[1] * 2))  # Keep 2x headroom for the final resample
+        return image
+
     def resize_image(self, new_size: tuple, filename: str):
-        resized = self.image.resize(new_size)
+        with self.open_for_size(new_size) as image:
+            resized = image.resize(new_size, Image.Resampling.LANCZOS)
         path = f"edited_images/{filename}"
         resized.save(path)
         print(f"✅ Resized image saved as {path}")
@@ -27,19 +40,23 @@ class PillowBasics:
         rotated.save(path)
         print(f"✅ Rotated image saved as {path}")
 
-    def flip_image(self, mode: str, filename: str):
+    @staticmethod
+    def _flipped(image, mode: str):
         if mode == "horizontal":
-            flipped = self.image.transpose(Image.FLIP_LEFT_RIGHT)
+            return image.transpose(Image.FLIP_LEFT_RIGHT)
         elif mode == "vertical":
-            flipped = self.image.transpose(Image.FLIP_TOP_BOTTOM)
+            return image.transpose(Image.FLIP_TOP_BOTTOM)
         else:
             raise ValueError("Mode must be 'horizontal' or 'vertical'")
-        
+
+    def flip_image(self, mode: str, filename: str):
+        flipped = self._flipped(self.image, mode)
         path = f"edited_images/{filename}"
         flipped.save(path)
         print(f"✅ Flipped image saved as {path}")
 
-    def apply_filter(self, filter_type: str, filename: str):
+    @staticmethod
+    def _filtered(image, filter_type: str):
         filters = {
             "blur": ImageFilter.BLUR,
             "contour": ImageFilter.CONTOUR,
@@ -47,8 +64,10 @@ class PillowBasics:
         }
         if filter_type not in filters:
             raise ValueError("Filter must be 'blur', 'contour', or 'sharpen'")
-        
-        filtered = self.image.filter(filters[filter_type])
+        return image.filter(filters[filter_type])
+
+    def apply_filter(self, filter_type: str, filename: str):
+        filtered = self._filtered(self.image, filter_type)
         path = f"edited_images/{filename}"
         filtered.save(path)
         print(f"✅ Filtered image saved as {path}")
@@ -59,8 +78,9 @@ class PillowBasics:
         grayscale.save(path)
         print(f"✅ Grayscale image saved as {path}")
 
-    def add_text(self, text: str, position: tuple, filename: str):
-        image_copy = self.image.copy()
+    @staticmethod
+    def _with_text(image, text: str, position: tuple):
+        image_copy = image.copy()
         draw = ImageDraw.Draw(image_copy)
 
         try:
@@ -69,10 +89,67 @@ class PillowBasics:
             font = ImageFont.load_default()
 
         draw.text(position, text, fill="white", font=font)
+        return image_copy
+
+    def add_text(self, text: str, position: tuple, filename: str):
+        image_copy = self._with_text(self.image, text, position)
         path = f"edited_images/{filename}"
         image_copy.save(path)
         print(f"✅ Image with text saved as {path}")
 
+    def make_variant(self, image, operation: str, **params):
+        """
+        Return a new image for one variant; `image` is only read, never modified.
+        Operations and parameter names mirror the single-output methods above.
+        """
+        if operation == "resize":
+            return image.resize(params["new_size"], Image.Resampling.LANCZOS)
+        if operation == "crop":
+            return image.crop(params["box"])
+        if operation == "rotate":
+            return image.rotate(params["angle"], expand=True)
+        if operation == "flip":
+            return self._flipped(image, params["mode"])
+        if operation == "filter":
+            return self._filtered(image, params["filter_type"])
+        if operation == "grayscale":
+            return image.convert("L")
+        if operation == "text":
+            return self._with_text(image, params["text"], params["position"])
+        raise ValueError("Operation must be 'resize', 'crop', 'rotate', 'flip', 'filter', 'grayscale' or 'text'")
+
+    def generate_variants(self, specs: list[dict], max_workers: int = None) -> list[dict]:
+        """
+        Decode the source once and render every variant from it concurrently.
+        specs: dicts with "operation", "filename" and the operation's parameters, e.g.
+               {"operation": "resize", "new_size": (300, 300), "filename": "resized.jpg"}
+        Threads are enough here: Pillow releases the GIL while resampling, filtering and encoding.
+        Returns one record per spec, in spec order, with its path, timing and encoded size.
+        """
+        self.image.load()  # Decode before sharing: lazy loading is not thread-safe
+
+        def render(spec):
+            params = {key: value for key, value in spec.items() if key not in ("operation", "filename")}
+            path = f"edited_images/{spec['filename']}"
+            start = time.perf_counter()
+            variant = self.make_variant(self.image, spec["operation"], **params)
+            variant.save(path)
+            return {
+                "filename": spec["filename"],
+                "path": path,
+                "seconds": time.perf_counter() - start,
+                "bytes": os.path.getsize(path),
+            }
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(render, specs))
+
+        for result in results:
+            print(f"✅ Variant saved as {result['path']} ({result['seconds'] * 1000:.1f} ms, {result['bytes']} bytes)")
+        print(f"📊 {len(results)} variants in {time.perf_counter() - start:.2f} s")
+        return results
+
     def access_pixels(self, x: int, y: int):
         pixel_value = self.image.getpixel((x, y))
         print(f"🔍 Pixel at ({x}, {y}): {pixel_value}")
@@ -94,5 +171,17 @@ def main():
     pb.add_text("Hello, World! I'm Betül", (500, 500), "text_added.jpg")
     pb.access_pixels(100, 100)
 
+    # Same variants again, decoded once and rendered concurrently
+    pb.generate_variants([
+        {"operation": "resize", "new_size": (300, 300), "filename": "variant_resized.jpg"},
+        {"operation": "crop", "box": (50, 50, 300, 300), "filename": "variant_cropped.jpg"},
+        {"operation": "rotate", "angle": 45, "filename": "variant_rotated.jpg"},
+        {"operation": "flip", "mode": "horizontal", "filename": "variant_flipped.jpg"},
+        {"operation": "filter", "filter_type": "sharpen", "filename": "variant_sharpened.jpg"},
+        {"operation": "filter", "filter_type": "blur", "filename": "variant_blur.jpg"},
+        {"operation": "grayscale", "filename": "variant_grayscale.jpg"},
+        {"operation": "text", "text": "Hello, World! I'm Betül", "position": (500, 500), "filename": "variant_text_added.jpg"},
+    ])
+
 if __name__ == "__main__":
     main()
@@ -1,7 +1,55 @@
-from PIL import Image
+from PIL import Image, TiffImagePlugin
 import os
+import shutil
 import numpy as np
 
+class ColorRuleSet:
+
+    def __init__(self, rules: list[tuple[tuple[int, int], tuple[int, int], tuple[int, int], tuple[int, int, int, int]]]):
+        """
+        Compile range -> color rules once into an exact RGB lookup table.
+        rules: [(r_range, g_range, b_range, new_color), ...] with the same meaning as ColorChange.change_color
+        Every pixel is matched against its original color; when ranges overlap, the later rule wins.
+        """
+        if len(rules) >= 65535:
+            raise ValueError("A rule set holds at most 65534 rules")
+        self.rules = list(rules)
+
+        # One entry per RGB color (16.7M) holding the 1-based index of the winning rule, 0 = unchanged.
+        # Indexed as [B, G, R] so the little-endian uint32 of an RGBA pixel (minus alpha) is the flat index.
+        self.lut = np.zeros((256, 256, 256), dtype=np.uint8 if len(self.rules) < 255 else np.uint16)
+        self.palette = np.zeros(len(self.rules) + 1, dtype="<u4")  # Replacement colors as packed RGBA
+        for index, (r_range, g_range, b_range, new_color) in enumerate(self.rules, start=1):
+            self.lut[b_range[0]:b_range[1] + 1, g_range[0]:g_range[1] + 1, r_range[0]:r_range[1] + 1] = index
+            self.palette[index] = np.array(new_color, dtype=np.uint8).view("<u4")[0]
+        self.lut = self.lut.ravel()
+
+    def apply(self, image_data: np.ndarray) -> np.ndarray:
+        """Recolor an (H, W, 4) uint8 RGBA array in one pass and return a new array."""
+        pixels = np.ascontiguousarray(image_data, dtype=np.uint8).view("<u4")[..., 0]
+        rule_index = self.lut.take(pixels & 0xFFFFFF)
+        recolored = np.where(rule_index != 0, self.palette.take(rule_index), pixels)
+        return recolored.view(np.uint8).reshape(image_data.shape)
+
+    def apply_inplace(self, image_data: np.ndarray):
+        """
+        Recolor an (H, W, 3) RGB or (H, W, 4) RGBA uint8 array in place (e.g. a band of a memmap).
+        RGB data gets the replacement color without its alpha; only matching pixels are written.
+        """
+        if image_data.shape[-1] == 4 and image_data.flags.c_contiguous:
+            pixels = image_data.view("<u4")[..., 0]
+            rule_index = self.lut.take(pixels & 0xFFFFFF)
+            np.copyto(pixels, self.palette.take(rule_index), where=rule_index != 0)
+            return
+
+        key = image_data[..., 0].astype(np.uint32)
+        key |= image_data[..., 1].astype(np.uint32) << 8
+        key |= image_data[..., 2].astype(np.uint32) << 16
+        rule_index = self.lut.take(key)
+        changed = rule_index != 0
+        colors = self.palette.view(np.uint8).reshape(-1, 4)[:, :image_data.shape[-1]]
+        image_data[changed] = colors[rule_index[changed]]
+
 class ColorChange:
     
     def __init__(self, image_path: str, folder_name: str):
@@ -36,6 +84,82 @@ class ColorChange:
         # Convert the modified data back to an image
         self.image = Image.fromarray(new_image_data, "RGBA")
 
+    def change_colors(self, rule_set: ColorRuleSet):
+        """
+        Apply many range -> color rules at once with a compiled ColorRuleSet.
+        Build the rule set once and reuse it for every image; there are no per-rule temporaries.
+        """
+        self.image = Image.fromarray(rule_set.apply(self.image_data), "RGBA")
+
+    @staticmethod
+    def map_strips(path: str, mode: str = "r", shape: tuple[int, int, int] = None) -> list[tuple[int, np.memmap]]:
+        """
+        Memory-map the pixels of an uncompressed image file as [(top row, (rows, W, C) uint8 array), ...].
+        shape: (height, width, channels) of a headerless .raw file; leave None for a TIFF,
+        which must be uncompressed, 8-bit RGB/RGBA and organized in full-width strips (one or many,
+        as Pillow, libtiff, scanners and GDAL write them). Strips stored back to back are mapped as one.
+        """
+        if shape is not None:
+            return [(0, np.memmap(path, dtype=np.uint8, mode=mode, shape=shape))]
+
+        with Image.open(path) as image:
+            width, height = image.size
+            tiles = sorted(image.tile, key=lambda tile: tile.extents[1])
+            channels = len(image.mode)
+            bottom = 0
+            for tile in tiles:
+                if (
+                    image.format != "TIFF" or image.mode not in ("RGB", "RGBA") or tile.codec_name != "raw"
+                    or tile.args != (image.mode, 0, 1) or tile.extents[::2] != (0, width) or tile.extents[1] != bottom
+                ):
+                    raise ValueError(f"Cannot memory-map {path}: not an uncompressed, strip-organized 8-bit RGB/RGBA TIFF")
+                bottom = tile.extents[3]
+            if bottom != height:
+                raise ValueError(f"Cannot memory-map {path}: the strips do not cover the image")
+
+        # Merge runs of strips that follow each other in the file into one mapping
+        runs = []
+        for tile in tiles:
+            top, rows = tile.extents[1], tile.extents[3] - tile.extents[1]
+            if runs and runs[-1][1] + runs[-1][2] * width * channels == tile.offset:
+                runs[-1][2] += rows
+            else:
+                runs.append([top, tile.offset, rows])
+        return [
+            (top, np.memmap(path, dtype=np.uint8, mode=mode, offset=offset, shape=(rows, width, channels)))
+            for top, offset, rows in runs
+        ]
+
+    @staticmethod
+    def map_pixels(path: str, mode: str = "r", shape: tuple[int, int, int] = None) -> np.memmap:
+        """
+        Memory-map the pixels of an uncompressed image file as one (H, W, C) uint8 array.
+        Same files as map_strips, as long as all the strips are stored back to back.
+        """
+        strips = ColorChange.map_strips(path, mode, shape)
+        if len(strips) != 1:
+            raise ValueError(f"Cannot memory-map {path} as one array: its strips are not contiguous, use map_strips")
+        return strips[0][1]
+
+    @staticmethod
+    def recolor_out_of_core(source_path: str, output_path: str, rule_set: ColorRuleSet, band_rows: int = 1024, shape: tuple[int, int, int] = None):
+        """
+        Recolor a huge raw or TIFF image band by band without ever loading it whole.
+        The source is copied to output_path (pass the same path to recolor the source itself) and
+        the copy is memory-mapped and edited in place, so memory use is proportional to band_rows.
+        RGB sources stay RGB: no alpha channel is added. See map_strips for the supported files.
+        """
+        ColorChange.map_strips(source_path, shape=shape)  # Fail before copying an unsupported file
+        if os.path.abspath(source_path) != os.path.abspath(output_path):
+            shutil.copyfile(source_path, output_path)
+
+        for _, pixels in ColorChange.map_strips(output_path, mode="r+", shape=shape):
+            for top in range(0, pixels.shape[0], band_rows):
+                rule_set.apply_inplace(pixels[top:top + band_rows])
+            pixels.flush()
+            del pixels
+        print(f"✅ Color-changed image saved at: {output_path}")
+
     def save_image(self, filename: str):
         
         path = os.path.join(self.folder_name, filename)
@@ -59,5 +183,24 @@ def main():
     cc.change_color(r_range, g_range, b_range, new_color)
     cc.save_image("color_changed_img.png")
 
+    # Many rules at once: compile them once, then reuse the rule set for any number of images
+    rule_set = ColorRuleSet([
+        (r_range, g_range, b_range, new_color),
+        ((0, 80), (0, 80), (0, 80), (20, 20, 60, 255)),        # Dark tones -> navy
+        ((200, 255), (200, 255), (200, 255), (255, 250, 230, 255)),  # Near white -> warm white
+    ])
+    cc.change_colors(rule_set)
+    cc.save_image("color_changed_rules_img.png")
+
+    # Out-of-core: an uncompressed TIFF written by libtiff in many strips, like scanners and GDAL do
+    scan_path = os.path.join(folder_name, "scan.tif")
+    TiffImagePlugin.WRITE_LIBTIFF = True
+    try:
+        with Image.open(image_path) as image:
+            image.convert("RGB").save(scan_path, compression="raw")
+    finally:
+        TiffImagePlugin.WRITE_LIBTIFF = False
+    ColorChange.recolor_out_of_core(scan_path, os.path.join(folder_name, "scan_recolored.tif"), rule_set)
+
 if __name__ == "__main__":
     main()
@@ -1,6 +1,14 @@
 import os
 from PIL import Image, ImageEnhance
 
+# Enhancer name -> Pillow enhancer class (its `degenerate` image is what every factor blends with)
+ENHANCERS = {
+    "brightness": ImageEnhance.Brightness,
+    "color": ImageEnhance.Color,
+    "contrast": ImageEnhance.Contrast,
+    "sharpness": ImageEnhance.Sharpness,
+}
+
 class PillowBasics:
     def __init__(self, image_path: str, folder_name: str):
         self.image = Image.open(image_path)
@@ -44,6 +52,33 @@ class PillowBasics:
         sharped_image.save(path)
         print(f"✅ Sharped image saved as {path}")
 
+    def iter_enhanced(self, enhancer: str, factors: list[float]):
+        """
+        Yield (factor, image) for every factor of one enhancer, one image at a time.
+        The enhancer (and so its degenerate image, the expensive part) is built once;
+        every factor is then a single Image.blend lerp against it.
+        """
+        if enhancer not in ENHANCERS:
+            raise ValueError(f"Enhancer must be one of {', '.join(ENHANCERS)}")
+
+        current_image = ENHANCERS[enhancer](self.image)
+        for factor in factors:
+            yield factor, current_image.enhance(factor)
+
+    def enhance_sweep(self, sweeps: dict[str, list[float]], filename_format: str = "{enhancer}_{factor:g}.jpg") -> list[str]:
+        """
+        Save many enhancement factors per enhancer, e.g. {"brightness": [0.5, 1.5], "contrast": [0.8, 1.2]}.
+        Each result is written as soon as it is computed, so only one output image is in memory.
+        """
+        paths = []
+        for enhancer, factors in sweeps.items():
+            for factor, image in self.iter_enhanced(enhancer, factors):
+                path = f"{self.folder_name}/{filename_format.format(enhancer=enhancer, factor=factor)}"
+                image.save(path)
+                paths.append(path)
+                print(f"✅ {enhancer.capitalize()} x{factor:g} image saved as {path}")
+        return paths
+
 
 def main():
     #Photo: Ekam Juneja: https://www.pexels.com/tr-tr/fotograf/dinamik-isik-efektleriyle-soyut-portre-31208192/
@@ -62,5 +97,9 @@ def main():
     pb.contrast_image("contrast_0.jpg", enhance_factor = 0)
     pb.sharped_image("sharped_0.jpg", enhance_factor = 0)
 
+    # Factor sweeps for A/B previews: one degenerate image per enhancer, many cheap blends
+    factors = [0.25, 0.5, 0.75, 1.25, 1.5, 2.0]
+    pb.enhance_sweep({"brightness": factors, "color": factors, "contrast": factors, "sharpness": factors})
+
 if __name__ == "__main__":
     main()
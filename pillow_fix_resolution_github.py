@@ -1,8 +1,13 @@
 import os
-from PIL import Image, ImageEnhance
+from PIL import Image, ImageEnhance, ImageStat
 
 #Photo by <a href="https://unsplash.com/@mianismusic?utm_content=creditCopyText&utm_medium=referral&utm_source=unsplash">Myan Nguyen</a> on <a href="https://unsplash.com/photos/gray-concrete-road-between-green-trees-during-daytime-D9SJWE89GyU?utm_content=creditCopyText&utm_medium=referral&utm_source=unsplash">Unsplash</a>
 
+# Enhancement factors of the sharpness -> contrast -> color chain
+SHARPNESS_FACTOR = 2.2
+CONTRAST_FACTOR = 1.2
+COLOR_FACTOR = 1.3
+
 class ImageResolution:
     def __init__(self, folder_name:str, image_path:str):
         self.image = Image.open(image_path)
@@ -15,11 +20,84 @@ class ImageResolution:
 
     def higger_resolution(self):
         enhancer = ImageEnhance.Sharpness(self.image)
-        sharpened_image = enhancer.enhance(2.2) 
+        sharpened_image = enhancer.enhance(SHARPNESS_FACTOR) 
         enhancer = ImageEnhance.Contrast(sharpened_image)
-        contrast_image = enhancer.enhance(1.2)
+        contrast_image = enhancer.enhance(CONTRAST_FACTOR)
         enhancer = ImageEnhance.Color(contrast_image)
-        self.final_image = enhancer.enhance(1.3)
+        self.final_image = enhancer.enhance(COLOR_FACTOR)
+
+    def _band_ranges(self, band_rows: int):
+        height = self.image.height
+        return [(top, min(top + band_rows, height)) for top in range(0, height, band_rows)]
+
+    def _sharpened_band(self, top: int, bottom: int):
+        """Sharpness stage for rows [top, bottom); one halo row on each side feeds the 3x3 SMOOTH kernel."""
+        width, height = self.image.size
+        halo_top, halo_bottom = max(top - 1, 0), min(bottom + 1, height)
+        band = self.image.crop((0, halo_top, width, halo_bottom))
+        sharpened = ImageEnhance.Sharpness(band).enhance(SHARPNESS_FACTOR)
+        return sharpened.crop((0, top - halo_top, width, bottom - halo_top))
+
+    def _finish_band(self, band, mean: int):
+        """Contrast and color stages for one band; contrast blends with the mean of the whole sharpened image."""
+        degenerate = Image.new("L", band.size, mean).convert(band.mode)  # Same as ImageEnhance.Contrast
+        if "A" in band.getbands():
+            degenerate.putalpha(band.getchannel("A"))
+        contrast_band = Image.blend(degenerate, band, CONTRAST_FACTOR)
+        return ImageEnhance.Color(contrast_band).enhance(COLOR_FACTOR)
+
+    @staticmethod
+    def _luminance_mean(histogram: list[int]) -> int:
+        return int(ImageStat.Stat(histogram).mean[0] + 0.5)  # Rounded like ImageEnhance.Contrast
+
+    def higger_resolution_fused(self, band_rows: int = 256):
+        """
+        Same result as higger_resolution(), pixel for pixel, without the three full-size intermediates.
+        Contrast needs the mean luminance of the whole sharpened image, so the bands are visited twice:
+          1. sharpen each band into the output buffer and accumulate its luminance histogram
+          2. apply contrast + color to each band of that buffer in place
+        """
+        self.final_image = Image.new(self.image.mode, self.image.size)
+        histogram = [0] * 256
+        for top, bottom in self._band_ranges(band_rows):
+            band = self._sharpened_band(top, bottom)
+            histogram = [a + b for a, b in zip(histogram, band.convert("L").histogram())]
+            self.final_image.paste(band, (0, top))
+
+        mean = self._luminance_mean(histogram)
+        for top, bottom in self._band_ranges(band_rows):
+            box = (0, top, self.image.width, bottom)
+            self.final_image.paste(self._finish_band(self.final_image.crop(box), mean), box)
+
+    def iter_fused_bands(self, band_rows: int = 256):
+        """
+        Streaming variant: yield (top, band) of the final image using only band-sized buffers.
+        The sharpened band is recomputed in the second pass instead of being kept for the whole image.
+        """
+        histogram = [0] * 256
+        for top, bottom in self._band_ranges(band_rows):
+            band_histogram = self._sharpened_band(top, bottom).convert("L").histogram()
+            histogram = [a + b for a, b in zip(histogram, band_histogram)]
+
+        mean = self._luminance_mean(histogram)
+        for top, bottom in self._band_ranges(band_rows):
+            yield top, self._finish_band(self._sharpened_band(top, bottom), mean)
+
+    def save_streaming(self, filename: str, band_rows: int = 256):
+        """
+        Write the enhanced image band by band as binary PPM (RGB) or PGM (L), which can be appended row-wise,
+        so a huge scan never needs a full-size output image in memory.
+        """
+        if self.image.mode not in ("RGB", "L"):
+            raise ValueError("Streaming output supports 'RGB' and 'L' images")
+
+        path = f"{self.folder_name}/{filename}"
+        magic = b"P6" if self.image.mode == "RGB" else b"P5"
+        with open(path, "wb") as file:
+            file.write(magic + f"\n{self.image.width} {self.image.height}\n255\n".encode("ascii"))
+            for _, band in self.iter_fused_bands(band_rows):
+                file.write(band.tobytes())
+        print(f"✅ Higher resolution image streamed to {path}")
 
 
     def save_with_resolution(self,filename:str):
@@ -37,7 +115,7 @@ def main():
     image_path = "low_resolution_sample.jpg" 
     folder_name = "higger_resolution"
     pillow_resolution = ImageResolution(image_path=image_path, folder_name=folder_name)
-    pillow_resolution.higger_resolution()
+    pillow_resolution.higger_resolution_fused()
     pillow_resolution.save_with_resolution("save_with_resolution.jpg")
     pillow_resolution.save_with_dpi("save_with_dpi.jpg")
 
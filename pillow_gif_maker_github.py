@@ -1,9 +1,23 @@
 import os
-from PIL import Image
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, GifImagePlugin
+
+# Palette index reserved for transparent pixels in streamed frames
+TRANSPARENT_INDEX = 255
+# Optimized mode: shared palette size. Pillow's per-frame adaptive palettes are much coarser than 255
+# shared colors; 48 shared colors have about the same color error on the Jump frames, in a smaller file
+OPTIMIZED_COLORS = 48
+# Optimized mode: share of unchanged opaque pixels in a delta box above which they are written as transparent
+MASK_UNCHANGED_SHARE = 0.25
 
 class GIFMaker:
-    def __init__(self, image_folder: str):
+    def __init__(self, image_folder: str, streaming: bool = False, workers: int = 1, read_ahead: int = None):
         self.image_folder = image_folder
+        self.streaming = streaming  # Load and encode frames one at a time instead of keeping them all
+        self.workers = workers  # Threads decoding and centering frames (Pillow releases the GIL while decoding)
+        self.read_ahead = read_ahead  # Max frames prepared ahead of the encoder (default: 2 per worker)
         self.output_folder = os.path.join(self.image_folder, "outputs")
         os.makedirs(self.output_folder, exist_ok=True)
 
@@ -17,12 +31,12 @@ class GIFMaker:
         if not self.image_paths:
             raise FileNotFoundError("⚠️ No image found in the folder.")
 
-        # Open the first image and set its size to canvas
-        first_image = Image.open(self.image_paths[0]).convert("RGBA")
-        self.canvas_size = first_image.size
+        # Open the first image and set its size to canvas (header only, no decoding)
+        with Image.open(self.image_paths[0]) as first_image:
+            self.canvas_size = first_image.size
 
-        # Center other images
-        self.image_list = [self.center_image(Image.open(path)) for path in self.image_paths]
+        # Center other images (streaming mode does it lazily in iter_frames)
+        self.image_list = None if self.streaming else list(self.iter_frames())
 
     def center_image(self, img):
         img = img.convert("RGBA")
@@ -33,9 +47,209 @@ class GIFMaker:
         canvas.paste(img, offset, img if img.mode == "RGBA" else None)
         return canvas
 
-    def create_gif(self, output_name="output.gif", duration=100):
+    def load_frame(self, path: str):
+        with Image.open(path) as img:
+            return self.center_image(img)
+
+    def iter_frames(self):
+        """
+        Load and center the frames in sorted path order.
+        With workers > 1 a thread pool prepares up to `read_ahead` frames ahead of the consumer,
+        so memory stays bounded while decoding runs on several cores.
+        """
+        if self.workers == 1:
+            for path in self.image_paths:
+                yield self.load_frame(path)
+            return
+
+        read_ahead = self.read_ahead or 2 * self.workers
+        paths = iter(self.image_paths)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque(executor.submit(self.load_frame, path) for _, path in zip(range(read_ahead), paths))
+            while pending:
+                frame = pending.popleft().result()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append(executor.submit(self.load_frame, next_path))
+                yield frame
+
+    @staticmethod
+    def to_palette_frame(frame):
+        """
+        RGBA canvas -> 'P' frame with an RGB palette of up to 255 colors.
+        Pixels that are mostly transparent get TRANSPARENT_INDEX, as GIF only has on/off transparency.
+        """
+        paletted = frame.convert("RGB").quantize(colors=255, method=Image.Quantize.FASTOCTREE)
+        transparent = frame.getchannel("A").point(lambda a: 255 if a < 128 else 0)
+        paletted.paste(TRANSPARENT_INDEX, mask=transparent)
+        palette = paletted.getpalette()
+        paletted.putpalette(palette + [0] * (768 - len(palette)))
+        return paletted
+
+    def create_gif_streaming(self, output_path: str, frames, duration=100):
+        """
+        Encode frames into the GIF as they arrive, so only one frame is held in memory.
+        Pillow's save(append_images=...) keeps every frame until the end; this writes the header with the
+        first frame's palette and then one self-contained frame (local color table) at a time.
+        """
+        frame_params = {"duration": duration, "disposal": 2, "transparency": TRANSPARENT_INDEX}
+        with open(output_path, "wb") as file:
+            for index, frame in enumerate(frames):
+                paletted = self.to_palette_frame(frame)
+                if index == 0:
+                    header, _ = GifImagePlugin.getheader(paletted, info={"loop": 0, **frame_params})
+                    file.write(b"".join(header))
+                chunks = GifImagePlugin.getdata(paletted, (0, 0), include_color_table=index > 0, **frame_params)
+                file.write(b"".join(chunks))
+            file.write(b";")  # GIF trailer
+
+    def build_global_palette(self, sample_count: int = 8, max_pixels: int = 1_000_000, colors: int = 255):
+        """
+        One palette (up to `colors`, at most 255) for the whole animation, from evenly spaced sample frames.
+        Frames already in image_list are reused; in streaming mode the samples are loaded from disk.
+        Only opaque pixels of every other row/column are sampled, with a fixed stride, so the result is deterministic.
+        Returns (flat RGB palette of 768 values, 32768-entry table mapping packed 5-bit RGB to a palette index).
+        """
+        picks = np.unique(np.linspace(0, len(self.image_paths) - 1, min(sample_count, len(self.image_paths))).round().astype(int))
+        samples = []
+        for index in picks:
+            if self.image_list is not None:
+                rgba = np.asarray(self.image_list[index])[::2, ::2]
+            else:
+                rgba = np.asarray(self.load_frame(self.image_paths[index]))[::2, ::2]
+            samples.append(rgba[rgba[..., 3] >= 128][:, :3])
+        pixels = np.concatenate(samples) if samples else np.zeros((0, 3), np.uint8)
+        if len(pixels) == 0:
+            pixels = np.zeros((1, 3), np.uint8)  # Fully transparent animation
+        pixels = pixels[::max(1, len(pixels) // max_pixels)]
+
+        strip = Image.fromarray(np.ascontiguousarray(pixels.reshape(-1, 1, 3)))
+        colors = min(colors, 255)  # TRANSPARENT_INDEX stays free
+        colors = np.array(strip.quantize(colors=colors, method=Image.Quantize.FASTOCTREE).getpalette(), dtype=np.float32).reshape(-1, 3)[:colors]
+
+        # Nearest palette color for every 5-bit RGB cell (sampled at the cell center).
+        # argmin |g - c|^2 = argmin |c|^2 - 2 g.c; every term is an integer below 2^24, so float32 is exact
+        # and the table is reproducible whatever BLAS does.
+        levels = np.arange(32, dtype=np.float32) * 8 + 4
+        grid = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1).reshape(-1, 3)
+        distance = (colors ** 2).sum(axis=1)[None, :] - 2 * grid @ colors.T
+        lut = distance.argmin(axis=1).astype(np.uint8)
+
+        palette = colors.astype(np.uint8).flatten().tolist()
+        return palette + [0] * (768 - len(palette)), lut
+
+    @staticmethod
+    def to_indices(frame, lut):
+        """RGBA frame -> 2D array of global palette indices, TRANSPARENT_INDEX where alpha < 128."""
+        rgba = np.asarray(frame)
+        key = (rgba[..., 0] >> 3).astype(np.uint16) << 10  # 5-bit RGB packed into one table key
+        key |= (rgba[..., 1] >> 3).astype(np.uint16) << 5
+        key |= rgba[..., 2] >> 3
+        indices = lut.take(key)
+        indices[rgba[..., 3] < 128] = TRANSPARENT_INDEX
+        return indices
+
+    @staticmethod
+    def _bbox(mask):
+        """(left, top, right, bottom) of the True pixels, or None."""
+        rows, cols = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+        if len(rows) == 0:
+            return None
+        return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+    @staticmethod
+    def _union(box_a, box_b):
+        if box_a is None or box_b is None:
+            return box_a or box_b
+        return (min(box_a[0], box_b[0]), min(box_a[1], box_b[1]), max(box_a[2], box_b[2]), max(box_a[3], box_b[3]))
+
+    def create_gif_optimized(self, output_path: str, frames, duration=100, sample_count: int = 8, colors: int = OPTIMIZED_COLORS):
+        """
+        Encode with one global palette and delta frames:
+          - every frame is mapped to the shared palette (no per-frame quantization, no local color tables),
+          - only the bounding box of pixels that changed is written, with unchanged pixels inside it made
+            transparent when enough of them are unchanged,
+          - identical consecutive frames are merged by extending the previous frame's duration.
+        Disposal is decided one frame ahead: 1 (keep) normally, 2 (clear the frame's box) when the next frame
+        turns opaque pixels transparent, with the box grown to cover those pixels. Frames stream through,
+        only the pending frame and the canvas state are kept. The output is byte-for-byte deterministic.
+        File size mostly follows `colors` (see OPTIMIZED_COLORS); pass up to 255 for higher color fidelity.
+        """
+        palette, lut = self.build_global_palette(sample_count, colors=colors)
+        width, height = self.canvas_size
+        empty = np.full((height, width), TRANSPARENT_INDEX, dtype=np.uint8)
+
+        def encode(file, current, before, box, frame_duration, disposal):
+            size = (box[2] - box[0], box[3] - box[1])
+            region = current[box[1]:box[3], box[0]:box[2]]
+            # Pixels equal to what is already on the canvas may be left transparent; that helps LZW on
+            # static backgrounds but hurts on noisy content where the unchanged pixels are scattered,
+            # so it is only done when a good share of the opaque pixels in the box are unchanged
+            unchanged = region == before[box[1]:box[3], box[0]:box[2]]
+            unchanged &= region != TRANSPARENT_INDEX
+            opaque = np.count_nonzero(region != TRANSPARENT_INDEX)
+            if opaque and np.count_nonzero(unchanged) >= MASK_UNCHANGED_SHARE * opaque:
+                region = np.where(unchanged, TRANSPARENT_INDEX, region)
+            frame_image = Image.frombytes("P", size, np.ascontiguousarray(region).tobytes())
+            frame_image.putpalette(palette)
+            chunks = GifImagePlugin.getdata(frame_image, box[:2], duration=frame_duration, disposal=disposal, transparency=TRANSPARENT_INDEX)
+            file.write(b"".join(chunks))
+
+        with open(output_path, "wb") as file:
+            header_image = Image.new("P", self.canvas_size, TRANSPARENT_INDEX)
+            header_image.putpalette(palette)
+            header, _ = GifImagePlugin.getheader(header_image, info={"loop": 0, "duration": duration, "transparency": TRANSPARENT_INDEX})
+            file.write(b"".join(header))
+
+            first = None
+            pending = None  # [indices, canvas before it, changed box, duration]
+            for frame in frames:
+                current = self.to_indices(frame, lut)
+                if pending is None:
+                    first = current
+                    pending = [current, empty, self._bbox(current != empty) or (0, 0, 1, 1), duration]
+                    continue
+
+                previous, before, box, frame_duration = pending
+                to_clear = (current == TRANSPARENT_INDEX) & (previous != TRANSPARENT_INDEX)
+                clear_box = self._bbox(to_clear)
+                if clear_box is None and np.array_equal(current, previous):
+                    pending[3] += duration  # Identical frame: just show the previous one longer
+                    continue
+
+                canvas = previous
+                disposal = 1
+                if clear_box is not None:
+                    box = self._union(box, clear_box)
+                    canvas = previous.copy()
+                    canvas[box[1]:box[3], box[0]:box[2]] = TRANSPARENT_INDEX  # What disposal 2 leaves behind
+                    disposal = 2
+                encode(file, previous, before, box, frame_duration, disposal)
+                pending = [current, canvas, self._bbox(current != canvas) or (0, 0, 1, 1), duration]
+
+            # Last frame: clear whatever the first frame does not cover, so the loop restarts cleanly
+            previous, before, box, frame_duration = pending
+            clear_box = self._bbox((first == TRANSPARENT_INDEX) & (previous != TRANSPARENT_INDEX))
+            disposal = 1
+            if clear_box is not None:
+                box, disposal = self._union(box, clear_box), 2
+            encode(file, previous, before, box, frame_duration, disposal)
+            file.write(b";")  # GIF trailer
+
+    def create_gif(self, output_name="output.gif", duration=100, optimize=False, colors=OPTIMIZED_COLORS):
         output_path = os.path.join(self.output_folder, output_name)
 
+        if optimize:
+            frames = self.iter_frames() if self.streaming else iter(self.image_list)
+            self.create_gif_optimized(output_path, frames, duration, colors=colors)
+            print(f"✅ : The optimized animated GIF file has been created and saved successfully{output_path}")
+            return
+
+        if self.streaming:
+            self.create_gif_streaming(output_path, self.iter_frames(), duration)
+            print(f"✅ : The animated GIF file has been streamed and saved successfully{output_path}")
+            return
+
         self.image_list[0].save(
             output_path,
             save_all=True,
@@ -49,8 +263,11 @@ class GIFMaker:
         print(f"✅ : The animated GIF file has been created and saved successfully{output_path}")
 
 def main():
-    app = GIFMaker(image_folder="gif_images")
+    app = GIFMaker(image_folder="gif_images", workers=os.cpu_count())
     app.create_gif()
 
+    # Shared palette + delta frames: smaller file, faster and deterministic encode
+    app.create_gif(output_name="output_optimized.gif", optimize=True)
+
 if __name__ == "__main__":
     main()
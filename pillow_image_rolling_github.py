@@ -1,8 +1,10 @@
 import os
+import numpy as np
 from PIL import Image, ImageEnhance
 
 class PillowRolling:
     def __init__(self, image_path: str, folder_name: str, sub_img_size:tuple):
+        self.image_path = image_path
         self.image = Image.open(image_path)
         self.sub_img_size = sub_img_size
         self.folder_name = folder_name
@@ -12,20 +14,47 @@ class PillowRolling:
         self.image.show()
 
     def resize_image(self):
-        self.resized_image = self.image.resize(self.sub_img_size)
+        # Decode a reduced-resolution JPEG draft (1/2, 1/4, 1/8) when the tile is much smaller than the image
+        with Image.open(self.image_path) as image:
+            image.draft(None, (self.sub_img_size[0] * 2, self.sub_img_size[1] * 2))
+            self.resized_image = image.resize(self.sub_img_size, Image.Resampling.LANCZOS)
     
-    def rolling_and_merging(self, filename: str):
-        new_image = Image.new("RGB",(self.image.width, self.image.height))
-        for i in range((self.image.width // self.sub_img_size[0]) +1):
-            for j in range((self.image.height // self.sub_img_size[1])+1):
-                new_x = i*self.sub_img_size[0]
-                new_y = j *self.sub_img_size[1]
-                new_image.paste(self.resized_image, (new_x, new_y ))
-        
+    def tile_row_strip(self, width: int):
+        """One tile-high strip of the mosaic, `width` pixels wide (RGB array)."""
+        tile = np.asarray(self.resized_image.convert("RGB"))
+        repeats = -(-width // tile.shape[1])  # Ceiling division
+        return np.tile(tile, (1, repeats, 1))[:, :width]
+
+    def tile_array(self, output_size: tuple = None):
+        """The whole mosaic as one array operation (defaults to the size of the original image)."""
+        width, height = output_size or self.image.size
+        strip = self.tile_row_strip(width)
+        repeats = -(-height // strip.shape[0])
+        return np.tile(strip, (repeats, 1, 1))[:height]
+
+    def rolling_and_merging(self, filename: str, output_size: tuple = None):
+        new_image = Image.fromarray(self.tile_array(output_size))
+
         path = f"{self.folder_name}/{filename}"
         new_image.save(path)
         print(f"✅ Rolled image saved as {path}")
 
+    def rolling_and_merging_striped(self, filename: str, output_size: tuple, stripe_rows: int = 512):
+        """
+        Mosaics too large for RAM: write a binary PPM one row band at a time.
+        Only one tile-high strip and one band of `stripe_rows` rows are in memory at once.
+        """
+        width, height = output_size
+        strip = self.tile_row_strip(width)
+
+        path = f"{self.folder_name}/{filename}"
+        with open(path, "wb") as file:
+            file.write(f"P6\n{width} {height}\n255\n".encode("ascii"))
+            for top in range(0, height, stripe_rows):
+                rows = np.arange(top, min(top + stripe_rows, height)) % strip.shape[0]
+                file.write(strip.take(rows, axis=0).tobytes())
+        print(f"✅ Rolled image streamed to {path}")
+
 def main():
     #Photo: Ekam Juneja: https://www.pexels.com/tr-tr/fotograf/dinamik-isik-efektleriyle-soyut-portre-31208192/
     image_path = "sample.jpg" 
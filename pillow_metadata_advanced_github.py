@@ -1,6 +1,13 @@
 from PIL import Image
-from PIL.ExifTags import TAGS
+from PIL.ExifTags import TAGS, IFD
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sqlite3
+import time
+
+INDEXED_EXTENSIONS = (".jpg", ".jpeg", ".tif", ".tiff", ".png", ".webp")
 
 class ExifMetadataExtractor:
     def __init__(self, image_path: str):
@@ -20,6 +27,184 @@ class ExifMetadataExtractor:
             tag_name = TAGS.get(tag_id, tag_id)
             print(f"{tag_name:25}: {value}")
 
+    @staticmethod
+    def _gps_degrees(dms, ref) -> float:
+        """(degrees, minutes, seconds) rationals -> signed decimal degrees."""
+        degrees = float(dms[0]) + float(dms[1]) / 60 + float(dms[2]) / 3600
+        return -degrees if ref in ("S", "W") else degrees
+
+    def summary(self) -> dict:
+        """
+        The fields worth indexing, read from the file header only (no pixel data is decoded):
+        format, width, height, make, model, taken_at (ISO), orientation, gps_lat, gps_lon.
+        """
+        if self.image.format == "PNG":
+            # PngImageFile.getexif() loads the pixels to find an eXIf chunk after the image data;
+            # only use the one already read with the header
+            exif_data = Image.Exif()
+            if "exif" in self.image.info:
+                exif_data.load(self.image.info["exif"])
+        else:
+            exif_data = self.image.getexif()
+        exif_ifd = exif_data.get_ifd(IFD.Exif)
+        gps_ifd = exif_data.get_ifd(IFD.GPSInfo)
+
+        taken_at = exif_ifd.get(36867) or exif_data.get(306)  # DateTimeOriginal, else DateTime
+        if isinstance(taken_at, str) and len(taken_at) >= 19:
+            taken_at = taken_at[:10].replace(":", "-") + taken_at[10:19]  # "2024:05:01 12:00:00" -> sortable ISO
+
+        gps_lat = gps_lon = None
+        if all(key in gps_ifd for key in (1, 2, 3, 4)):
+            try:
+                gps_lat = self._gps_degrees(gps_ifd[2], gps_ifd[1])
+                gps_lon = self._gps_degrees(gps_ifd[4], gps_ifd[3])
+            except (TypeError, ValueError, ZeroDivisionError, IndexError):
+                pass  # Malformed GPS block: index the photo without a location
+
+        def text(value):
+            if value is None:
+                return None
+            return str(value).strip("\x00 ") or None
+
+        return {
+            "format": self.image.format,
+            "width": self.image.width,
+            "height": self.image.height,
+            "make": text(exif_data.get(271)),
+            "model": text(exif_data.get(272)),
+            "taken_at": taken_at if isinstance(taken_at, str) else None,
+            "orientation": exif_data.get(274),
+            "gps_lat": gps_lat,
+            "gps_lon": gps_lon,
+        }
+
+
+class ExifIndexer:
+    """
+    Index the header metadata of a whole directory tree into a local SQLite database.
+    Headers are parsed in parallel worker processes; pixels are never decoded.
+    A refresh only re-reads files whose size or mtime changed and drops rows of deleted files.
+    """
+
+    COLUMNS = ("path", "folder", "size", "mtime_ns", "format", "width", "height", "make", "model",
+               "taken_at", "orientation", "gps_lat", "gps_lon", "error")
+
+    def __init__(self, db_path: str = "exif_index.sqlite"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30.0)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS photos ("
+                " path TEXT PRIMARY KEY, folder TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+                " format TEXT, width INTEGER, height INTEGER, make TEXT, model TEXT, taken_at TEXT,"
+                " orientation INTEGER, gps_lat REAL, gps_lon REAL, error TEXT)"
+            )
+            # Indexes for the usual questions: per folder (refresh), per camera, per date, per area
+            self.conn.execute("CREATE INDEX IF NOT EXISTS photos_folder ON photos (folder)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS photos_camera ON photos (make, model)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS photos_taken_at ON photos (taken_at)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS photos_gps ON photos (gps_lat, gps_lon)")
+
+    @staticmethod
+    def read_headers(files: list[tuple[str, str, int, int]]) -> list[tuple]:
+        """Worker: (path, folder, size, mtime_ns) -> index rows. A bad file becomes a row with an error."""
+        rows = []
+        for path, folder, size, mtime_ns in files:
+            try:
+                extractor = ExifMetadataExtractor(path)
+                try:
+                    summary = extractor.summary()
+                finally:
+                    extractor.image.close()
+                rows.append((path, folder, size, mtime_ns, *summary.values(), None))
+            except Exception as exc:
+                rows.append((path, folder, size, mtime_ns, None, None, None, None, None, None, None, None, None, f"{type(exc).__name__}: {exc}"))
+        return rows
+
+    def _changed_files(self, root: str):
+        """Walk the tree folder by folder, yield new/changed files and drop rows of deleted ones."""
+        seen_folders = []
+        stack = [os.path.abspath(root)]
+        while stack:
+            folder = stack.pop()
+            seen_folders.append(folder)
+            known = {
+                row["path"]: (row["size"], row["mtime_ns"])
+                for row in self.conn.execute("SELECT path, size, mtime_ns FROM photos WHERE folder = ?", (folder,))
+            }
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                entries = []
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and entry.name.lower().endswith(INDEXED_EXTENSIONS):
+                    stat = entry.stat()
+                    if known.pop(entry.path, None) != (stat.st_size, stat.st_mtime_ns):
+                        yield (entry.path, folder, stat.st_size, stat.st_mtime_ns)
+            if known:
+                with self.conn:
+                    self.conn.executemany("DELETE FROM photos WHERE path = ?", ((path,) for path in known))
+
+        # Folders that disappeared entirely
+        root_prefix = os.path.join(os.path.abspath(root), "")
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_folders (folder TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM seen_folders")
+            self.conn.executemany("INSERT OR IGNORE INTO seen_folders VALUES (?)", ((folder,) for folder in seen_folders))
+            self.conn.execute(
+                "DELETE FROM photos WHERE (folder = ? OR substr(folder, 1, ?) = ?)"
+                " AND folder NOT IN (SELECT folder FROM seen_folders)",
+                (os.path.abspath(root), len(root_prefix), root_prefix),
+            )
+
+    def refresh(self, root: str, workers: int = None, batch_size: int = 256) -> int:
+        """
+        Bring the index up to date with a directory tree and return the number of files (re)read.
+        workers: header-parsing processes (None = all cores); batches of batch_size files are
+        handed out while the walk continues, with at most 2 batches per worker in flight.
+        """
+        workers = workers or os.cpu_count() or 1
+        start = time.perf_counter()
+        placeholders = ", ".join("?" * len(self.COLUMNS))
+        insert = f"INSERT OR REPLACE INTO photos ({', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+        pending = deque()
+        indexed = 0
+
+        def write(rows):
+            with self.conn:
+                self.conn.executemany(insert, rows)
+            return len(rows)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batch = []
+            for file in self._changed_files(root):
+                batch.append(file)
+                if len(batch) == batch_size:
+                    pending.append(executor.submit(self.read_headers, batch))
+                    batch = []
+                    while len(pending) >= 2 * workers:
+                        indexed += write(pending.popleft().result())
+            if batch:
+                pending.append(executor.submit(self.read_headers, batch))
+            while pending:
+                indexed += write(pending.popleft().result())
+
+        total = self.conn.execute("SELECT COUNT(*) FROM photos").fetchone()[0]
+        print(f"🗂️ Indexed {indexed} new or changed files in {time.perf_counter() - start:.2f} s ({total} in index)")
+        return indexed
+
+    def query(self, where: str = "1", params: tuple = ()) -> list[sqlite3.Row]:
+        """Rows matching an SQL condition, e.g. query("make = ? AND taken_at >= ?", ("Canon", "2024-01-01"))."""
+        return self.conn.execute(f"SELECT * FROM photos WHERE {where} ORDER BY path", params).fetchall()
+
+    def close(self):
+        self.conn.close()
+
 
 def main():
     # Note: Not all images contain EXIF metadata. 
@@ -33,6 +218,13 @@ def main():
     extractor = ExifMetadataExtractor(image_path=image_path)
     extractor.display_exif_data()
 
+    # Index a whole folder tree; running it again only re-reads new or modified files
+    indexer = ExifIndexer("exif_index.sqlite")
+    indexer.refresh(".")
+    for row in indexer.query("make IS NOT NULL")[:10]:
+        print(f"📷 {row['path']}: {row['make']} {row['model']} {row['taken_at']}")
+    indexer.close()
+
 
 if __name__ == "__main__":
     main()